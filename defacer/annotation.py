@@ -1,14 +1,35 @@
 """手動アノテーション機能"""
 
+import bisect
 import json
 import numpy as np
 from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterator, Callable
+from typing import Callable, Iterable, Iterator, KeysView, Sequence
 
 from defacer.models import BoundingBox, Annotation  # noqa: F401 (再エクスポート)
 
+# アノテーションがないフレームに対して返す共有の空シーケンス
+_NO_ANNOTATIONS: tuple[Annotation, ...] = ()
+
+# (frame, track_id) インデックスのキーを1つのintに詰める際のトラックIDのビット幅
+# （タプルキーは参照のたびに確保が発生するため、intキーでハッシュ・比較を軽くする）
+_TRACK_ID_BITS = 24
+_MAX_TRACK_ID = (1 << _TRACK_ID_BITS) - 1
+
+
+def _frame_track_key(frame: int, track_id: int) -> int | tuple[int, int]:
+    """
+    (frame, track_id) をインデックス用のキーに変換
+
+    通常のトラックIDは1つのintに詰める。ビット幅に収まらないID（負数や2^24以上）は
+    他のキーと衝突しないよう、タプルキーにフォールバックする。
+    """
+    if 0 <= track_id <= _MAX_TRACK_ID:
+        return (frame << _TRACK_ID_BITS) | track_id
+    return (frame, track_id)
+
 
 @dataclass
 class AnnotationStore:
@@ -21,66 +42,80 @@ class AnnotationStore:
 
     # パフォーマンス最適化用キャッシュ
     _total_count: int = 0
-    _track_ids: set[int] = field(default_factory=set)
-    _track_count: dict[int, int] = field(default_factory=dict)  # track_id → アノテーション数
+    _track_count: dict[int, int] = field(default_factory=dict)  # track_id → アノテーション数（キーが全トラックID）
 
     # 高速アクセス用インデックス
     _track_annotations: dict[int, dict[int, Annotation]] = field(default_factory=dict)  # track_id → {id(ann): ann}
-    _frame_track_index: dict[tuple[int, int], Annotation] = field(default_factory=dict)  # (frame, track_id) → ann
+    _frame_track_index: dict[int | tuple[int, int], Annotation] = field(default_factory=dict)  # _frame_track_key(frame, track_id) → ann
+    _track_frames: dict[int, list[int]] = field(default_factory=dict)  # track_id → ソート済みフレーム番号
 
     # 進捗通知コールバック
     progress_callback: Callable[[int, int], None] | None = None
 
     def _rebuild_cache(self) -> None:
         """キャッシュを再構築（重複除去も実施）"""
+        frames = list(self.annotations.items())
+        self._load_frames(frames, len(frames))
+
+    def _load_frames(
+        self, frames: Iterable[tuple[int, list[Annotation]]], total: int
+    ) -> None:
+        """
+        フレームごとのアノテーションを格納し、重複除去と全インデックスの構築を1パスで行う
+
+        既存のアノテーションとインデックスは置き換える。framesは遅延生成でもよく、
+        各フレームは格納と同時にインデックス化される。
+
+        Args:
+            frames: (フレーム番号, アノテーションのリスト) のイテラブル
+            total: フレーム数（進捗通知用）
+        """
         import logging
 
+        self.annotations.clear()
         self._total_count = 0
-        self._track_ids.clear()
         self._track_count.clear()
         self._track_annotations.clear()
         self._frame_track_index.clear()
+        self._track_frames.clear()
 
-        frames = list(self.annotations.items())
-        total = len(frames)
         total_duplicates_removed = 0
 
+        frame_lists = self.annotations
+        frame_track_index = self._frame_track_index
+        track_count = self._track_count
+        track_annotations = self._track_annotations
+        track_frames = self._track_frames
+
         for i, (frame, anns) in enumerate(frames):
             # 進捗通知（100フレームごと）
             if self.progress_callback and total > 100 and i % 100 == 0:
                 self.progress_callback(i, total)
 
-            # 重複除去: (frame, track_id) の組み合わせが重複している場合、先勝ちで保持
-            seen_track_ids = set()
+            # 重複除去とインデックス構築を1パスで行う
+            # （(frame, track_id) インデックスを既出判定に使い、先勝ちで保持）
             cleaned_anns = []
-            duplicates_in_frame = 0
-
             for ann in anns:
-                if ann.track_id is not None:
-                    if ann.track_id in seen_track_ids:
-                        # 重複を検出
-                        duplicates_in_frame += 1
+                track_id = ann.track_id
+                if track_id is not None:
+                    key = _frame_track_key(frame, track_id)
+                    if key in frame_track_index:
                         continue
-                    seen_track_ids.add(ann.track_id)
-
+                    anns_by_id = track_annotations.get(track_id)
+                    if anns_by_id is None:
+                        anns_by_id = track_annotations[track_id] = {}
+                    frame_track_index[key] = ann
+                    track_count[track_id] = track_count.get(track_id, 0) + 1
+                    anns_by_id[id(ann)] = ann
+                    track_frames.setdefault(track_id, []).append(frame)
                 cleaned_anns.append(ann)
 
-            # 重複があった場合はリストを更新
-            if duplicates_in_frame > 0:
-                self.annotations[frame] = cleaned_anns
-                total_duplicates_removed += duplicates_in_frame
-
+            total_duplicates_removed += len(anns) - len(cleaned_anns)
+            frame_lists[frame] = cleaned_anns
             self._total_count += len(cleaned_anns)
-            for ann in cleaned_anns:
-                if ann.track_id is not None:
-                    self._track_ids.add(ann.track_id)
-                    self._track_count[ann.track_id] = self._track_count.get(ann.track_id, 0) + 1
 
-                    # 高速インデックスを構築
-                    if ann.track_id not in self._track_annotations:
-                        self._track_annotations[ann.track_id] = {}
-                    self._track_annotations[ann.track_id][id(ann)] = ann
-                    self._frame_track_index[(frame, ann.track_id)] = ann
+        for frames_of_track in track_frames.values():
+            frames_of_track.sort()
 
         # 完了通知
         if self.progress_callback and total > 100:
@@ -97,14 +132,17 @@ class AnnotationStore:
         同一(frame, track_id)のアノテーションが既に存在する場合は、
         既存のアノテーションを更新（bbox, is_manual, confidenceを上書き）
         """
+        frame = annotation.frame
+        # キーは変更前に求める（範囲外の整数IDもキーにできるため、例外になるのはtrack_idが
+        # 整数でない型の場合のみ。その場合もここで例外になり、ストアは変更されない）
+        key = None if annotation.track_id is None else _frame_track_key(frame, annotation.track_id)
+
         if save_undo:
             self._save_undo_state()
 
-        frame = annotation.frame
-
         # track_id が None でない場合、重複チェック
-        if annotation.track_id is not None:
-            existing = self._frame_track_index.get((frame, annotation.track_id))
+        if key is not None:
+            existing = self._frame_track_index.get(key)
             if existing is not None:
                 # 既存のアノテーションを更新（リストへの追加はしない）
                 existing.bbox = annotation.bbox
@@ -121,14 +159,103 @@ class AnnotationStore:
         # キャッシュ更新
         self._total_count += 1
         if annotation.track_id is not None:
-            self._track_ids.add(annotation.track_id)
             self._track_count[annotation.track_id] = self._track_count.get(annotation.track_id, 0) + 1
 
             # インデックス更新
             if annotation.track_id not in self._track_annotations:
                 self._track_annotations[annotation.track_id] = {}
             self._track_annotations[annotation.track_id][id(annotation)] = annotation
-            self._frame_track_index[(frame, annotation.track_id)] = annotation
+            self._frame_track_index[key] = annotation
+            self._insert_track_frame(annotation.track_id, frame)
+
+    def add_many(self, annotations: Iterable[Annotation], save_undo: bool = True) -> int:
+        """
+        複数のアノテーションを一括追加
+
+        add()を繰り返し呼ぶのと同じ結果になるが、Undo保存は1回のみで、
+        トラックごとのソート済みフレームリストは最後にまとめて更新する。
+
+        Args:
+            annotations: 追加するアノテーション
+            save_undo: Undoスタックに保存するか（追加対象がない場合は保存しない）
+
+        Returns:
+            新規追加されたアノテーション数（既存の更新分は含まない）
+        """
+        annotations = list(annotations)
+        if not annotations:
+            return 0
+
+        # 全件のキーを変更前に求める（track_idが整数でない型のものが途中にあっても、
+        # ここで例外になりストアは変更されない）
+        keys = [
+            None if ann.track_id is None else _frame_track_key(ann.frame, ann.track_id)
+            for ann in annotations
+        ]
+
+        if save_undo:
+            self._save_undo_state()
+
+        frame_lists = self.annotations
+        frame_track_index = self._frame_track_index
+        track_annotations = self._track_annotations
+        track_count = self._track_count
+        new_track_frames: dict[int, list[int]] = {}
+        added = 0
+
+        for annotation, key in zip(annotations, keys):
+            frame = annotation.frame
+            track_id = annotation.track_id
+
+            if key is not None:
+                existing = frame_track_index.get(key)
+                if existing is not None:
+                    existing.bbox = annotation.bbox
+                    existing.is_manual = annotation.is_manual
+                    existing.confidence = annotation.confidence
+                    continue
+
+            frame_anns = frame_lists.get(frame)
+            if frame_anns is None:
+                frame_lists[frame] = [annotation]
+            else:
+                frame_anns.append(annotation)
+            added += 1
+
+            if track_id is not None:
+                track_count[track_id] = track_count.get(track_id, 0) + 1
+                anns_by_id = track_annotations.get(track_id)
+                if anns_by_id is None:
+                    anns_by_id = track_annotations[track_id] = {}
+                anns_by_id[id(annotation)] = annotation
+                frame_track_index[key] = annotation
+                new_track_frames.setdefault(track_id, []).append(frame)
+
+        self._total_count += added
+
+        # ソート済みフレームリストをトラックごとに一括更新
+        # （既存のソート済み列と追加分の2つのランをtimsortがマージするため、ほぼ線形）
+        for track_id, frames in new_track_frames.items():
+            track_frames = self._track_frames.setdefault(track_id, [])
+            track_frames.extend(frames)
+            track_frames.sort()
+
+        return added
+
+    def _insert_track_frame(self, track_id: int, frame: int) -> None:
+        """ソート済みフレームリストにフレームを挿入（O(log n) 探索）"""
+        bisect.insort(self._track_frames.setdefault(track_id, []), frame)
+
+    def _discard_track_frame(self, track_id: int, frame: int) -> None:
+        """ソート済みフレームリストからフレームを除去"""
+        frames = self._track_frames.get(track_id)
+        if not frames:
+            return
+        i = bisect.bisect_left(frames, frame)
+        if i < len(frames) and frames[i] == frame:
+            del frames[i]
+        if not frames:
+            del self._track_frames[track_id]
 
     def remove(self, frame: int, index: int, save_undo: bool = True) -> Annotation | None:
         """アノテーションを削除"""
@@ -151,7 +278,6 @@ class AnnotationStore:
             count = self._track_count.get(removed.track_id, 0)
             if count <= 1:
                 # 最後の1個なので削除
-                self._track_ids.discard(removed.track_id)
                 self._track_count.pop(removed.track_id, None)
                 self._track_annotations.pop(removed.track_id, None)
             else:
@@ -162,7 +288,8 @@ class AnnotationStore:
                     self._track_annotations[removed.track_id].pop(id(removed), None)
 
             # フレーム×トラックインデックスから削除
-            self._frame_track_index.pop((frame, removed.track_id), None)
+            self._frame_track_index.pop(_frame_track_key(frame, removed.track_id), None)
+            self._discard_track_frame(removed.track_id, frame)
 
         return removed
 
@@ -174,8 +301,7 @@ class AnnotationStore:
 
         # インデックスで存在確認（O(1)）
         if annotation.track_id is not None:
-            key = (frame, annotation.track_id)
-            if key not in self._frame_track_index:
+            if _frame_track_key(frame, annotation.track_id) not in self._frame_track_index:
                 return False
 
         # リストから削除位置を特定
@@ -186,9 +312,14 @@ class AnnotationStore:
         except ValueError:
             return False
 
-    def get_frame_annotations(self, frame: int) -> list[Annotation]:
-        """指定フレームのアノテーションを取得"""
-        return self.annotations.get(frame, [])
+    def get_frame_annotations(self, frame: int) -> Sequence[Annotation]:
+        """指定フレームのアノテーションを取得
+
+        ストア内部のリストをコピーせずに返すため、呼び出し側で変更してはならない
+        （変更が必要な場合は list() でコピーする）。アノテーションがないフレームでは
+        共有の空タプルを返し、描画・エクスポートのループでリストを確保しない。
+        """
+        return self.annotations.get(frame, _NO_ANNOTATIONS)
 
     def get_all_frames(self) -> list[int]:
         """アノテーションがあるフレームのリスト"""
@@ -210,9 +341,21 @@ class AnnotationStore:
         self._next_track_id += 1
         return track_id
 
-    def get_all_track_ids(self) -> set[int]:
-        """すべてのトラックIDを取得（None除く）"""
-        return self._track_ids.copy()
+    def get_all_track_ids(self) -> KeysView[int]:
+        """すべてのトラックIDを取得（None除く）
+
+        参照カウントのキーをコピーせずに返す（所属判定はO(1)）。
+        ストアの変更に追従するビューのため、列挙中にトラックを追加・削除する場合は
+        set()でコピーしてから使うこと。
+        """
+        return self._track_count.keys()
+
+    def iter_track_ids(self) -> Iterator[int]:
+        """すべてのトラックIDをコピーせずに列挙（None除く）
+
+        列挙中にトラックの追加・削除を行ってはならない（既存トラックへの追加は可）。
+        """
+        return iter(self._track_count)
 
     def get_track_info(self, track_id: int) -> dict:
         """トラックの情報を取得（フレーム範囲、アノテーション数）"""
@@ -220,17 +363,18 @@ class AnnotationStore:
         if track_id not in self._track_annotations:
             return {"exists": False}
 
-        anns = self._track_annotations[track_id].values()
-        if not anns:
+        anns = self._track_annotations[track_id]
+        frames = self._track_frames.get(track_id)
+        if not anns or not frames:
             return {"exists": False}
 
-        frames = [ann.frame for ann in anns]
+        # (frame, track_id) は一意なので、ソート済みリストの両端が範囲になる
         return {
             "exists": True,
-            "frame_min": min(frames),
-            "frame_max": max(frames),
-            "frame_count": len(set(frames)),
-            "annotation_count": len(frames),
+            "frame_min": frames[0],
+            "frame_max": frames[-1],
+            "frame_count": len(frames),
+            "annotation_count": len(anns),
         }
 
     def remove_track(self, track_id: int, save_undo: bool = True) -> int:
@@ -290,26 +434,30 @@ class AnnotationStore:
 
         # キャッシュ更新
         self._total_count -= count
-        self._track_ids.discard(track_id)
         self._track_count.pop(track_id, None)
         self._track_annotations.pop(track_id, None)
+        self._track_frames.pop(track_id, None)
 
         # フレーム×トラックインデックスから削除
         for ann in target_anns:
-            self._frame_track_index.pop((ann.frame, track_id), None)
+            self._frame_track_index.pop(_frame_track_key(ann.frame, track_id), None)
 
         return count
 
     def get_track_frames(self, track_id: int) -> list[int]:
         """指定トラックIDのアノテーションが存在するフレーム番号のリストを取得"""
-        if track_id not in self._track_annotations:
+        return list(self._track_frames.get(track_id, []))
+
+    def get_track_frames_in_range(
+        self, track_id: int, start_frame: int | None = None, end_frame: int | None = None
+    ) -> list[int]:
+        """指定トラックIDの [start_frame, end_frame] 内のフレーム番号を取得（O(log n + k)、Noneは端まで）"""
+        frames = self._track_frames.get(track_id)
+        if not frames:
             return []
-        
-        frames = set()
-        for ann in self._track_annotations[track_id].values():
-            frames.add(ann.frame)
-        
-        return sorted(list(frames))
+        lo = bisect.bisect_left(frames, start_frame) if start_frame is not None else 0
+        hi = bisect.bisect_right(frames, end_frame) if end_frame is not None else len(frames)
+        return frames[lo:hi]
 
     def merge_tracks(
         self,
@@ -337,77 +485,81 @@ class AnnotationStore:
         if save_undo:
             self._save_undo_state()
 
-        # インデックスから対象アノテーションを直接取得
-        if source_track_id not in self._track_annotations:
+        # sourceトラックのソート済みフレームリスト（逆引きインデックス）のみを走査
+        source_frames = self._track_frames.get(source_track_id)
+        if not source_frames:
             return 0
 
-        source_anns = list(self._track_annotations[source_track_id].values())
+        frame_track_index = self._frame_track_index
 
         # 衝突チェック: target_track_idが既に存在するフレームを特定
-        conflicting_anns = []
-        non_conflicting_anns = []
-
-        for ann in source_anns:
-            if (ann.frame, target_track_id) in self._frame_track_index:
-                conflicting_anns.append(ann)
+        conflicting_frames = []
+        moved_frames = []
+        for frame in source_frames:
+            if _frame_track_key(frame, target_track_id) in frame_track_index:
+                conflicting_frames.append(frame)
             else:
-                non_conflicting_anns.append(ann)
+                moved_frames.append(frame)
 
-        # 衝突するアノテーションを削除
-        for ann in conflicting_anns:
-            frame = ann.frame
-            if frame in self.annotations:
-                try:
-                    self.annotations[frame].remove(ann)
-                    self._total_count -= 1
-                    # 空になったフレームを削除
-                    if not self.annotations[frame]:
-                        del self.annotations[frame]
-                except ValueError:
-                    pass
+        # 衝突するアノテーションを削除（インデックスからも除去）
+        for frame in conflicting_frames:
+            ann = frame_track_index.pop(_frame_track_key(frame, source_track_id))
+            self._remove_from_frame(frame, ann)
+            self._total_count -= 1
 
         # 衝突しないアノテーションのtrack_idを変更
-        total = len(non_conflicting_anns)
-        for i, ann in enumerate(non_conflicting_anns):
+        total = len(moved_frames)
+        for i, frame in enumerate(moved_frames):
             # 進捗通知（100個ごと）
             if self.progress_callback and total > 100 and i % 100 == 0:
                 self.progress_callback(i, total)
 
-            # track_idを変更
-            old_frame = ann.frame
+            ann = frame_track_index.pop(_frame_track_key(frame, source_track_id))
             ann.track_id = target_track_id
-
-            # インデックスを更新
-            self._frame_track_index.pop((old_frame, source_track_id), None)
-            self._frame_track_index[(old_frame, target_track_id)] = ann
+            frame_track_index[_frame_track_key(frame, target_track_id)] = ann
 
         # 完了通知
         if self.progress_callback and total > 100:
             self.progress_callback(total, total)
 
-        # キャッシュ更新
-        self._track_ids.discard(source_track_id)
-        self._track_ids.add(target_track_id)
-
-        # sourceトラックのカウントを削除
-        self._track_count.pop(source_track_id, 0)
-
-        # targetトラックのカウントを更新（衝突削除分を除く）
-        self._track_count[target_track_id] = self._track_count.get(target_track_id, 0) + len(non_conflicting_anns)
+        # トラック単位のインデックスを更新
+        source_anns = self._track_annotations.pop(source_track_id)
+        self._track_frames.pop(source_track_id)
+        self._track_count.pop(source_track_id, None)
+        if not moved_frames:
+            return 0
 
-        # トラックアノテーションインデックスを更新
         if target_track_id not in self._track_annotations:
-            self._track_annotations[target_track_id] = {}
-
-        # 衝突しないアノテーションのみを移動
-        for ann in non_conflicting_anns:
-            ann_id = id(ann)
-            self._track_annotations[target_track_id][ann_id] = ann
-
-        # sourceトラックのインデックスをクリーンアップ
-        self._track_annotations.pop(source_track_id, None)
-
-        return len(non_conflicting_anns)
+            # targetが存在しない場合は衝突もないため、sourceのインデックスをそのまま引き継ぐ
+            self._track_annotations[target_track_id] = source_anns
+            self._track_frames[target_track_id] = moved_frames
+            self._track_count[target_track_id] = len(moved_frames)
+            return len(moved_frames)
+
+        target_anns = self._track_annotations[target_track_id]
+        for frame in moved_frames:
+            ann = frame_track_index[_frame_track_key(frame, target_track_id)]
+            target_anns[id(ann)] = ann
+        self._track_count[target_track_id] += len(moved_frames)
+
+        # 2つのソート済みリストを統合（timsortが2つのランをほぼ線形にマージ）
+        merged_frames = self._track_frames[target_track_id]
+        merged_frames.extend(moved_frames)
+        merged_frames.sort()
+
+        return len(moved_frames)
+
+    def _remove_from_frame(self, frame: int, annotation: Annotation) -> None:
+        """フレームのリストから指定のアノテーションを（同値ではなく同一オブジェクトで）除去"""
+        anns = self.annotations.get(frame)
+        if anns is None:
+            return
+        for i, ann in enumerate(anns):
+            if ann is annotation:
+                del anns[i]
+                break
+        if not anns:
+            del self.annotations[frame]
 
     def split_track(
         self,
@@ -460,8 +612,8 @@ class AnnotationStore:
             ann.track_id = new_track_id
 
             # インデックスを更新
-            self._frame_track_index.pop((old_frame, track_id), None)
-            self._frame_track_index[(old_frame, new_track_id)] = ann
+            self._frame_track_index.pop(_frame_track_key(old_frame, track_id), None)
+            self._frame_track_index[_frame_track_key(old_frame, new_track_id)] = ann
 
             # トラックアノテーションインデックスを更新
             ann_id = id(ann)
@@ -470,10 +622,15 @@ class AnnotationStore:
 
         # キャッシュ更新
         moved_count = len(annotations_to_move)
-        self._track_ids.add(new_track_id)
         self._track_count[new_track_id] = moved_count
         self._track_count[track_id] -= moved_count
 
+        # ソート済みフレームリストを分割位置で切り分け
+        frames = self._track_frames[track_id]
+        split_idx = bisect.bisect_left(frames, split_frame)
+        self._track_frames[new_track_id] = frames[split_idx:]
+        del frames[split_idx:]
+
         return new_track_id
 
     def interpolate_frames(
@@ -484,19 +641,9 @@ class AnnotationStore:
         save_undo: bool = True,
     ) -> int:
         """指定トラックIDの開始/終了フレーム間を補間"""
-        # 開始と終了のアノテーションを探す
-        start_ann = None
-        end_ann = None
-
-        for ann in self.get_frame_annotations(start_frame):
-            if ann.track_id == track_id:
-                start_ann = ann
-                break
-
-        for ann in self.get_frame_annotations(end_frame):
-            if ann.track_id == track_id:
-                end_ann = ann
-                break
+        # 開始と終了のアノテーションをインデックスから取得（O(1)）
+        start_ann = self.get_annotation_by_frame_track(start_frame, track_id)
+        end_ann = self.get_annotation_by_frame_track(end_frame, track_id)
 
         if start_ann is None or end_ann is None:
             return 0
@@ -504,28 +651,28 @@ class AnnotationStore:
         if save_undo:
             self._save_undo_state()
 
-        # 中間フレームを生成
-        count = 0
-        for frame in range(start_frame + 1, end_frame):
-            t = (frame - start_frame) / (end_frame - start_frame)
-            interpolated_bbox = BoundingBox.interpolate(start_ann.bbox, end_ann.bbox, t)
+        # 区間内の既存フレームはソート済みリストのスライスで一括取得
+        existing_frames = set(self.get_track_frames_in_range(track_id, start_frame + 1, end_frame - 1))
 
-            existing = self.get_annotation_by_frame_track(frame, track_id)
+        # 中間フレームのbboxをまとめて計算
+        ts = np.arange(1, end_frame - start_frame) / (end_frame - start_frame)
+        interpolated_bboxes = BoundingBox.interpolate_many(start_ann.bbox, end_ann.bbox, ts)
 
-            if existing:
-                existing.bbox = interpolated_bbox
+        # 中間フレームを生成（新規分はまとめて追加）
+        new_anns = []
+        for frame, interpolated_bbox in zip(range(start_frame + 1, end_frame), interpolated_bboxes):
+            if frame in existing_frames:
+                self._frame_track_index[_frame_track_key(frame, track_id)].bbox = interpolated_bbox
             else:
-                new_ann = Annotation(
+                new_anns.append(Annotation(
                     frame=frame,
                     bbox=interpolated_bbox,
                     track_id=track_id,
                     is_manual=True,
                     confidence=1.0,
-                )
-                self.add(new_ann, save_undo=False)
-                count += 1
+                ))
 
-        return count
+        return self.add_many(new_anns, save_undo=False)
 
     def remove_range(
         self,
@@ -566,14 +713,14 @@ class AnnotationStore:
                     # トラック情報の更新
                     self._track_count[ann.track_id] -= 1
                     if self._track_count[ann.track_id] <= 0:
-                        self._track_ids.discard(ann.track_id)
                         self._track_count.pop(ann.track_id, None)
                         self._track_annotations.pop(ann.track_id, None)
                     else:
                         if ann.track_id in self._track_annotations:
                             self._track_annotations[ann.track_id].pop(id(ann), None)
                     
-                    self._frame_track_index.pop((frame, ann.track_id), None)
+                    self._frame_track_index.pop(_frame_track_key(frame, ann.track_id), None)
+                    self._discard_track_frame(ann.track_id, frame)
             
             del self.annotations[frame]
             
@@ -588,10 +735,10 @@ class AnnotationStore:
 
         # キャッシュリセット
         self._total_count = 0
-        self._track_ids.clear()
         self._track_count.clear()
         self._track_annotations.clear()
         self._frame_track_index.clear()
+        self._track_frames.clear()
 
     def _save_undo_state(self) -> None:
         """現在の状態をUndoスタックに保存"""
@@ -627,14 +774,18 @@ class AnnotationStore:
 
     def _restore_state(self, state: dict) -> None:
         """状態を復元"""
-        self.annotations.clear()
-        for frame_str, annotations in state.get("annotations", {}).items():
-            frame = int(frame_str)
-            self.annotations[frame] = [Annotation.from_dict(a) for a in annotations]
+        self._load_serialized_frames(state.get("annotations", {}))
         self._next_track_id = state.get("next_track_id", 1)
 
-        # キャッシュ再構築
-        self._rebuild_cache()
+    def _load_serialized_frames(self, annotations: dict[str, list[dict]]) -> None:
+        """to_dict形式のアノテーションを復元（復元・重複除去・インデックス構築を1パスで行う）"""
+        self._load_frames(
+            (
+                (int(frame_str), [Annotation.from_dict(a) for a in frame_anns])
+                for frame_str, frame_anns in annotations.items()
+            ),
+            len(annotations),
+        )
 
     def to_dict(self) -> dict:
         """JSON用の辞書に変換"""
@@ -650,14 +801,8 @@ class AnnotationStore:
     def from_dict(cls, data: dict) -> "AnnotationStore":
         """辞書から復元"""
         store = cls()
-        for frame_str, annotations in data.get("annotations", {}).items():
-            frame = int(frame_str)
-            store.annotations[frame] = [Annotation.from_dict(a) for a in annotations]
+        store._load_serialized_frames(data.get("annotations", {}))
         store._next_track_id = data.get("next_track_id", 1)
-
-        # キャッシュ初期化
-        store._rebuild_cache()
-
         return store
 
     def save(self, path: Path | str) -> None:
@@ -681,14 +826,27 @@ class AnnotationStore:
         for frame in sorted(self.annotations.keys()):
             yield from self.annotations[frame]
 
-    def get_annotation_by_frame_track(self, frame: int, track_id: int) -> Annotation | None:
-        """指定フレーム・トラックIDのアノテーションを取得（O(1)）"""
-        return self._frame_track_index.get((frame, track_id))
+    def get_annotation_by_frame_track(self, frame: int, track_id: int | None) -> Annotation | None:
+        """指定フレーム・トラックIDのアノテーションを取得（O(1)、track_idがNoneの場合はNone）"""
+        if track_id is None:
+            return None
+        return self._frame_track_index.get(_frame_track_key(frame, track_id))
+
+    def get_track_endpoints(self, track_id: int) -> tuple[Annotation, Annotation] | None:
+        """指定トラックの最初と最後のアノテーションを取得（O(1)、トラックがなければNone）"""
+        frames = self._track_frames.get(track_id)
+        if not frames:
+            return None
+        return (
+            self._frame_track_index[_frame_track_key(frames[0], track_id)],
+            self._frame_track_index[_frame_track_key(frames[-1], track_id)],
+        )
 
     def get_track_annotations(self, track_id: int) -> list["Annotation"]:
         """指定トラックの全アノテーションをフレーム順で取得"""
-        anns_dict = self._track_annotations.get(track_id, {})
-        return sorted(anns_dict.values(), key=lambda a: a.frame)
+        frames = self._track_frames.get(track_id, [])
+        frame_track_index = self._frame_track_index
+        return [frame_track_index[_frame_track_key(frame, track_id)] for frame in frames]
 
     def get_all_track_stats(self) -> dict[int, dict]:
         """全トラックの統計情報を取得（インデックス活用でO(トラック数 × 平均アノテーション数)）
@@ -697,13 +855,12 @@ class AnnotationStore:
             {track_id: {"frame_min": int, "frame_max": int, "count": int}}
         """
         result = {}
-        for track_id, anns_dict in self._track_annotations.items():
-            if not anns_dict:
+        for track_id, frames in self._track_frames.items():
+            if not frames:
                 continue
-            frames = [ann.frame for ann in anns_dict.values()]
             result[track_id] = {
-                "frame_min": min(frames),
-                "frame_max": max(frames),
+                "frame_min": frames[0],
+                "frame_max": frames[-1],
                 "count": len(frames),
             }
         return result
@@ -1,6 +1,7 @@
 """匿名化処理の抽象ベースクラス"""
 
 from abc import ABC, abstractmethod
+from functools import cache, lru_cache
 from typing import Callable
 
 import cv2
@@ -9,6 +10,42 @@ import numpy as np
 from defacer.models import BoundingBox
 
 
+@cache
+def enable_opencl() -> bool:
+    """
+    OpenCL（OpenCV T-API）が利用可能であれば、プロセス全体で有効化してTrueを返す
+
+    cv2.ocl.setUseOpenCL(True) を呼ぶため、以降のOpenCV処理全体に影響する。
+    判定は初回呼び出し時のみ行い、以降はキャッシュした結果を返す。
+    OpenCLデバイスがない環境では常にFalse（CPU処理のまま）。
+    """
+    try:
+        if not cv2.ocl.haveOpenCL():
+            return False
+        cv2.ocl.setUseOpenCL(True)
+        return cv2.ocl.useOpenCL()
+    except cv2.error:
+        return False
+
+
+@lru_cache(maxsize=2048)
+def _ellipse_mask(height: int, width: int) -> np.ndarray:
+    """
+    ROIサイズに内接する楕円マスクを返す（サイズごとにキャッシュ）
+
+    追跡中の顔はフレーム間でほぼ同じサイズが続くため、毎フレームの描画を省ける。
+    キャッシュを共有するため、返す配列は書き込み不可。
+
+    Returns:
+        (height, width, 1) のbool配列（ROIの3チャンネルへブロードキャスト可能）
+    """
+    mask = np.zeros((height, width), dtype=np.uint8)
+    cv2.ellipse(mask, (width // 2, height // 2), (width // 2, height // 2), 0, 0, 360, 255, -1)
+    mask = (mask > 0)[:, :, None]
+    mask.flags.writeable = False
+    return mask
+
+
 class Anonymizer(ABC):
     """匿名化処理の抽象ベースクラス"""
 
@@ -18,6 +55,7 @@ class Anonymizer(ABC):
         frame: np.ndarray,
         bbox: BoundingBox,
         ellipse: bool = True,
+        inplace: bool = False,
     ) -> np.ndarray:
         """
         指定領域に匿名化処理を適用
@@ -26,6 +64,7 @@ class Anonymizer(ABC):
             frame: BGR画像（OpenCV形式）
             bbox: バウンディングボックス
             ellipse: Trueの場合は楕円形、Falseの場合は矩形でマスク
+            inplace: Trueの場合はコピーせずframeを直接書き換える
 
         Returns:
             処理後のフレーム
@@ -38,6 +77,7 @@ class Anonymizer(ABC):
         bbox: BoundingBox,
         transform_roi: Callable[[np.ndarray], np.ndarray],
         ellipse: bool,
+        inplace: bool = False,
     ) -> np.ndarray:
         """
         ROI変換を適用する共通テンプレートメソッド。
@@ -50,6 +90,7 @@ class Anonymizer(ABC):
             bbox: バウンディングボックス
             transform_roi: ROI（numpy配列）を受け取り変換後ROIを返す関数
             ellipse: Trueの場合は楕円形、Falseの場合は矩形でマスク
+            inplace: Trueの場合はframe.copyを省略してframeへ直接書き込む
 
         Returns:
             処理後のフレーム（変更なしの場合は元のframeオブジェクトを返す）
@@ -61,7 +102,7 @@ class Anonymizer(ABC):
         if x2 <= x1 or y2 <= y1:
             return frame
 
-        result = frame.copy()
+        result = frame if inplace else frame.copy()
         roi = result[y1:y2, x1:x2]
         roi_h, roi_w = roi.shape[:2]
 
@@ -71,10 +112,8 @@ class Anonymizer(ABC):
         transformed = transform_roi(roi)
 
         if ellipse:
-            mask = np.zeros((roi_h, roi_w), dtype=np.uint8)
-            cv2.ellipse(mask, (roi_w // 2, roi_h // 2), (roi_w // 2, roi_h // 2), 0, 0, 360, 255, -1)
-            mask_3ch = cv2.merge([mask, mask, mask])
-            result[y1:y2, x1:x2] = np.where(mask_3ch > 0, transformed, roi)
+            # roiはresultのビューなので、楕円内の画素だけを直接書き換える
+            np.copyto(roi, transformed, where=_ellipse_mask(roi_h, roi_w))
         else:
             result[y1:y2, x1:x2] = transformed
 
@@ -85,6 +124,7 @@ class Anonymizer(ABC):
         frame: np.ndarray,
         bboxes: list[BoundingBox],
         ellipse: bool = True,
+        inplace: bool = False,
     ) -> np.ndarray:
         """
         複数の領域に匿名化処理を適用
@@ -93,11 +133,12 @@ class Anonymizer(ABC):
             frame: BGR画像（OpenCV形式）
             bboxes: バウンディングボックスのリスト
             ellipse: Trueの場合は楕円形、Falseの場合は矩形でマスク
+            inplace: Trueの場合はコピーせずframeを直接書き換える
 
         Returns:
             処理後のフレーム
         """
         result = frame
         for bbox in bboxes:
-            result = self.apply(result, bbox, ellipse)
+            result = self.apply(result, bbox, ellipse, inplace)
         return result
@@ -3,25 +3,30 @@
 import cv2
 import numpy as np
 
-from defacer.anonymization.base import Anonymizer
+from defacer.anonymization.base import Anonymizer, enable_opencl
 from defacer.models import BoundingBox
 
 
 class MosaicAnonymizer(Anonymizer):
     """ピクセル化モザイク処理"""
 
-    def __init__(self, block_size: int = 10):
+    def __init__(self, block_size: int = 10, use_opencl: bool = False):
         """
         Args:
             block_size: モザイクのブロックサイズ（ピクセル）
+            use_opencl: OpenCLが利用可能な場合にUMat経由で縮小・拡大を実行するか
+                （ROIごとにGPUとの転送が発生し、小さな顔領域ではCPUより遅くなりやすいため既定で無効。
+                有効にするとOpenCLがプロセス全体で有効化される）
         """
         self.block_size = block_size
+        self.use_opencl = use_opencl and enable_opencl()
 
     def apply(
         self,
         frame: np.ndarray,
         bbox: BoundingBox,
         ellipse: bool = True,
+        inplace: bool = False,
     ) -> np.ndarray:
         """
         指定領域にモザイクを適用
@@ -30,18 +35,22 @@ class MosaicAnonymizer(Anonymizer):
             frame: BGR画像（OpenCV形式）
             bbox: (x1, y1, x2, y2) 形式のバウンディングボックス
             ellipse: Trueの場合は楕円形、Falseの場合は矩形でマスク
+            inplace: Trueの場合はコピーせずframeを直接書き換える
 
         Returns:
             処理後のフレーム
         """
         block_size = self.block_size
+        use_opencl = self.use_opencl
 
         def _mosaic(roi: np.ndarray) -> np.ndarray:
             roi_h, roi_w = roi.shape[:2]
             # 縮小→拡大でピクセル化効果
             small_w = max(1, roi_w // block_size)
             small_h = max(1, roi_h // block_size)
-            small = cv2.resize(roi, (small_w, small_h), interpolation=cv2.INTER_LINEAR)
-            return cv2.resize(small, (roi_w, roi_h), interpolation=cv2.INTER_NEAREST)
+            src = cv2.UMat(roi) if use_opencl else roi
+            small = cv2.resize(src, (small_w, small_h), interpolation=cv2.INTER_LINEAR)
+            mosaic = cv2.resize(small, (roi_w, roi_h), interpolation=cv2.INTER_NEAREST)
+            return mosaic.get() if use_opencl else mosaic
 
-        return self._apply_roi(frame, bbox, _mosaic, ellipse)
+        return self._apply_roi(frame, bbox, _mosaic, ellipse, inplace)
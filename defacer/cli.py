@@ -99,6 +99,11 @@ def create_parser() -> argparse.ArgumentParser:
         default="medium",
         help="エンコード速度プリセット（デフォルト: medium）",
     )
+    auto_parser.add_argument(
+        "--hw-encode",
+        action="store_true",
+        help="利用可能ならハードウェアエンコーダ（NVENC/VideoToolbox/QSV）を使用",
+    )
 
     return parser
 
@@ -199,7 +204,7 @@ def run_auto(args: argparse.Namespace) -> int:
 
     # 動画を読み込み
     try:
-        reader = VideoReader(args.input)
+        reader = VideoReader(args.input, backend="ffmpeg")
     except Exception as e:
         print(f"エラー: 動画の読み込みに失敗: {e}", file=sys.stderr)
         return 1
@@ -215,12 +220,16 @@ def run_auto(args: argparse.Namespace) -> int:
     next_track_id = 1
 
     with tqdm(total=reader.frame_count, desc="検出") as pbar:
-        for frame_num, frame in reader:
-            if tracker and tracker.supports_integrated_tracking():
-                # 統合トラッキング: detect + track を一度に
-                for t in tracker.track(frame):
+        if tracker and tracker.supports_integrated_tracking():
+            # 統合トラッキング: 複数フレームをまとめて detect + track
+            # （readerは先頭から順にイテレートするため、結果の順番がフレーム番号になる）
+            frames = (frame for _, frame in reader)
+            for frame_num, tracked in enumerate(tracker.track_stream(frames)):
+                for t in tracked:
                     store.add(Annotation.from_detection(t, frame_num, t.track_id, args.bbox_scale, reader.width, reader.height), save_undo=False)
-            else:
+                pbar.update(1)
+        else:
+            for frame_num, frame in reader:
                 detections = detector.detect(frame)
                 if tracker:
                     # 旧APIトラッカー（DeepSORTなど）
@@ -232,7 +241,7 @@ def run_auto(args: argparse.Namespace) -> int:
                         store.add(Annotation.from_detection(det, frame_num, next_track_id, args.bbox_scale, reader.width, reader.height), save_undo=False)
                         next_track_id += 1
 
-            pbar.update(1)
+                pbar.update(1)
 
     reader.release()
     print(f"\n検出完了: {len(store)}件の顔領域")
@@ -252,6 +261,7 @@ def run_auto(args: argparse.Namespace) -> int:
 
             config = ExportConfig(
                 anonymizer=anonymizer,
+                codec="auto" if args.hw_encode else "libx264",
                 crf=args.crf,
                 preset=args.preset,
             )
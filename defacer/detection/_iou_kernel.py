@@ -0,0 +1,39 @@
+"""IoU行列計算カーネル（Numba JIT、オプション）
+
+numba がインストールされていない場合は import 時に ImportError となるため、
+呼び出し側で NumPy 実装にフォールバックすること。
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def iou_matrix(boxes1, boxes2):
+    """
+    (N, 4) と (M, 4) の xyxy 配列から (N, M) のIoU行列を計算
+
+    BoundingBox.iouと同じ規則（重なりがなければ0、和集合が0以下なら0）で計算する。
+    """
+    n = boxes1.shape[0]
+    m = boxes2.shape[0]
+    result = np.empty((n, m), dtype=np.float64)
+
+    for i in range(n):
+        ax1 = boxes1[i, 0]
+        ay1 = boxes1[i, 1]
+        ax2 = boxes1[i, 2]
+        ay2 = boxes1[i, 3]
+        area_a = (ax2 - ax1) * (ay2 - ay1)
+
+        for j in range(m):
+            # 重なりの有無で分岐せず、幅・高さを0でクランプして交差面積を0にする
+            inter_w = max(min(ax2, boxes2[j, 2]) - max(ax1, boxes2[j, 0]), 0)
+            inter_h = max(min(ay2, boxes2[j, 3]) - max(ay1, boxes2[j, 1]), 0)
+            inter = inter_w * inter_h
+            area_b = (boxes2[j, 2] - boxes2[j, 0]) * (boxes2[j, 3] - boxes2[j, 1])
+            # 整数座標では交差面積が正なら和集合は1以上のため、下限1は交差なしの場合のみ効く
+            union = max(area_a + area_b - inter, 1)
+            result[i, j] = inter / union
+
+    return result
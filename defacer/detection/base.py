@@ -2,6 +2,7 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from itertools import chain
 
 import numpy as np
 
@@ -16,6 +17,23 @@ class Detection:
     confidence: float
     landmarks: np.ndarray | None = None  # 顔のランドマーク（オプション）
 
+    @staticmethod
+    def stack(detections: list["Detection"]) -> np.ndarray:
+        """
+        検出結果のbboxを連続した配列にまとめる
+
+        行ごとのリストを経由せず、座標を1本のイテレータから直接配列へ書き込む。
+
+        Args:
+            detections: 検出結果のリスト
+
+        Returns:
+            (N, 4) の int32 配列（x1, y1, x2, y2）
+        """
+        n = len(detections)
+        coords = chain.from_iterable(det.bbox.to_tuple() for det in detections)
+        return np.fromiter(coords, dtype=np.int32, count=4 * n).reshape(n, 4)
+
 
 def find_best_iou_match(
     target_bbox: BoundingBox,
@@ -43,11 +61,84 @@ def find_best_iou_match(
     return best_match if best_iou >= threshold else None
 
 
+def find_best_iou_matches(
+    target_bboxes: np.ndarray,
+    candidate_bboxes: np.ndarray,
+    threshold: float = 0.3,
+) -> np.ndarray:
+    """
+    各対象について、IoUで最も一致する候補のインデックスを一括で返す
+
+    find_best_iou_matchを対象ごとに呼ぶ代わりに、候補のbbox配列を一度だけ作り
+    IoU行列をまとめて計算する。同率の場合は先頭の候補を選ぶ。
+
+    Args:
+        target_bboxes: (N, 4) の xyxy 配列
+        candidate_bboxes: (M, 4) の xyxy 配列
+        threshold: この値以上のIoUが必要（未満の場合は-1）
+
+    Returns:
+        (N,) の int64 配列（一致した候補のインデックス、なければ-1）
+    """
+    n = len(target_bboxes)
+    if n == 0 or len(candidate_bboxes) == 0:
+        return np.full(n, -1, dtype=np.int64)
+
+    iou = compute_iou_matrix(target_bboxes, candidate_bboxes)
+    best = iou.argmax(axis=1)
+    best_iou = iou[np.arange(n), best]
+    return np.where((best_iou > 0) & (best_iou >= threshold), best, -1)
+
+
 def compute_iou(bbox1: BoundingBox, bbox2: BoundingBox) -> float:
     """2つのバウンディングボックスのIoUを計算"""
     return bbox1.iou(bbox2)
 
 
+def _load_iou_kernel():
+    """Numba JITのIoUカーネルを読み込む（numba未インストール時はNone）"""
+    try:
+        from defacer.detection._iou_kernel import iou_matrix
+    except ImportError:
+        return None
+    return iou_matrix
+
+
+def compute_iou_matrix(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    """
+    2組のバウンディングボックス間のIoU行列を一括計算
+
+    BoundingBox.iouと同じ規則（重なりがなければ0、和集合が0以下なら0）で計算する。
+    numbaが利用可能な場合はJITカーネル、なければNumPyのブロードキャストで計算する。
+
+    Args:
+        boxes1: (N, 4) の xyxy 配列
+        boxes2: (M, 4) の xyxy 配列
+
+    Returns:
+        (N, M) の float64 配列
+    """
+    a = np.ascontiguousarray(boxes1, dtype=np.int64).reshape(-1, 4)
+    b = np.ascontiguousarray(boxes2, dtype=np.int64).reshape(-1, 4)
+
+    iou_matrix = _load_iou_kernel()
+    if iou_matrix is not None:
+        return iou_matrix(a, b)
+
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    # 重なりがない場合は幅・高さを0にクランプし、マスクなしで交差面積を0にする
+    wh = np.clip(bottom_right - top_left, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    # 整数座標では交差面積が正なら和集合は1以上のため、下限1は交差なしの場合のみ効く
+    union = np.maximum(area_a[:, None] + area_b[None, :] - inter, 1)
+
+    return inter / union
+
+
 class FaceDetector(ABC):
     """顔検知の抽象ベースクラス"""
 
@@ -1,13 +1,19 @@
 """YOLOv11-Face顔検知実装"""
 
+from functools import cache
+
 import numpy as np
 
 from defacer.models import BoundingBox, DEFAULT_DETECTION_THRESHOLD
 from defacer.detection.base import FaceDetector, Detection
 
 
+@cache
 def download_yolo11_face_model() -> str:
-    """YOLOv11顔検出モデルをHugging Face Hubからダウンロードしてパスを返す"""
+    """YOLOv11顔検出モデルをHugging Face Hubからダウンロードしてパスを返す
+
+    取得したパスはプロセス内でキャッシュし、2回目以降はHubへの問い合わせを省略する。
+    """
     try:
         from huggingface_hub import hf_hub_download
     except ImportError:
@@ -85,29 +91,35 @@ class YOLO11FaceDetector(FaceDetector):
         detections = []
 
         for result in results:
-            if result.boxes is None:
+            boxes = result.boxes
+            if boxes is None or len(boxes) == 0:
                 continue
 
-            for box in result.boxes:
-                # 顔検出専用モデルのため、クラスフィルタリング不要
-                # すべての検出結果が顔として扱われる
-                confidence = float(box.conf[0]) if box.conf is not None else 0.0
-
-                if confidence < self.confidence_threshold:
-                    continue
-
-                detection = Detection(
-                    bbox=BoundingBox.from_xyxy(box.xyxy[0].cpu().numpy()),
-                    confidence=confidence,
-                    landmarks=None,
+            # 顔検出専用モデルのため、クラスフィルタリング不要
+            # すべての検出結果が顔として扱われる
+            # 座標・信頼度は結果全体をまとめて1回でCPUへ転送する
+            xyxy = boxes.xyxy.cpu().numpy()
+            if boxes.conf is not None:
+                confidences = boxes.conf.cpu().numpy()
+            else:
+                confidences = np.zeros(len(xyxy), dtype=np.float32)
+
+            keep = confidences >= self.confidence_threshold
+            for box, confidence in zip(xyxy[keep].tolist(), confidences[keep].tolist()):
+                detections.append(
+                    Detection(
+                        bbox=BoundingBox.from_xyxy(box),
+                        confidence=confidence,
+                        landmarks=None,
+                    )
                 )
-                detections.append(detection)
 
         return detections
 
 
+@cache
 def is_yolo11_available() -> bool:
-    """YOLOv11が利用可能か確認"""
+    """YOLOv11が利用可能か確認（結果はプロセス内でキャッシュ）"""
     try:
         from ultralytics import YOLO
         from huggingface_hub import hf_hub_download
@@ -605,7 +605,7 @@ class MainWindow(QMainWindow):
         max_thumbnails = min(50, max_thumbnails)
         
         # 表示範囲内のフレームを抽出
-        visible_frames = [f for f in frames if start_view <= f <= end_view]
+        visible_frames = store.get_track_frames_in_range(annotation.track_id, start_view, end_view)
         
         target_frames = []
         if not visible_frames:
@@ -629,8 +629,7 @@ class MainWindow(QMainWindow):
         for frame_num in target_frames:
             
             # アノテーション情報を取得（座標用）
-            ann_list = store.get_frame_annotations(frame_num)
-            target_ann = next((a for a in ann_list if a.track_id == annotation.track_id), None)
+            target_ann = store.get_annotation_by_frame_track(frame_num, annotation.track_id)
             
             img = self._video_player.get_thumbnail(frame_num)
             if img:
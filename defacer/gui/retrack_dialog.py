@@ -16,8 +16,9 @@ from PyQt5.QtWidgets import (
 )
 
 from defacer.video.reader import VideoReader
-from defacer.gui.annotation import AnnotationStore, Annotation
-from defacer.detection.base import Detection, find_best_iou_match
+from defacer.gui.annotation import AnnotationStore
+from defacer.detection.base import Detection, find_best_iou_matches
+from defacer.tracking.base import TrackedFace
 from defacer.gui.worker_dialog import WorkerDialog
 from defacer.gui.frame_range_selector import FrameRangeSelector
 
@@ -51,14 +52,17 @@ class RetrackWorker(QThread):
     def cancel(self):
         self._cancelled = True
 
-    def _build_track_id_mapping(self, anns: list[Annotation], tracked: list) -> dict:
+    def _build_track_id_mapping(self, detections: list[Detection], tracked: list) -> dict:
         """bbox位置でマッチングしてtrack_idマッピングを構築"""
-        mapping = {}
-        for idx, ann in enumerate(anns):
-            best_match = find_best_iou_match(ann.bbox, tracked, threshold=0.5)
-            if best_match is not None:
-                mapping[idx] = best_match.track_id
-        return mapping
+        # トラックのbboxはフレームごとに一度だけ配列化し、全アノテーションと一括比較
+        matches = find_best_iou_matches(
+            Detection.stack(detections), TrackedFace.stack(tracked), threshold=0.5
+        )
+        return {
+            idx: tracked[match].track_id
+            for idx, match in enumerate(matches.tolist())
+            if match >= 0
+        }
 
     def run(self):
         try:
@@ -120,7 +124,7 @@ class RetrackWorker(QThread):
                 tracked = tracker.update(detections, frame)
 
                 # track_idマッピングを構築
-                frame_mapping = self._build_track_id_mapping(anns, tracked)
+                frame_mapping = self._build_track_id_mapping(detections, tracked)
 
                 # グローバルマッピングに追加
                 for ann_idx, new_track_id in frame_mapping.items():
@@ -21,6 +21,14 @@ from defacer.video.reader import VideoReader
 from defacer.gui.annotation import BoundingBox, Annotation, AnnotationStore
 from defacer.gui.utils import bgr_to_qimage
 
+# 矢印キー → 単位移動量 (dx, dy)
+_NUDGE_DELTAS: dict[int, tuple[int, int]] = {
+    Qt.Key_Up: (0, -1),
+    Qt.Key_Down: (0, 1),
+    Qt.Key_Left: (-1, 0),
+    Qt.Key_Right: (1, 0),
+}
+
 
 @dataclass
 class MergeCandidateState:
@@ -931,49 +939,33 @@ class VideoPlayerWidget(QLabel):
         if not self._selected_annotation or not self._reader:
             return
 
+        delta = _NUDGE_DELTAS.get(key)
+        if delta is None:
+            return
+
         bbox = self._selected_annotation.bbox
         is_shift = modifiers & Qt.ShiftModifier
         is_ctrl = modifiers & Qt.ControlModifier
 
         # 移動量
         step = 10 if is_ctrl else 1
+        dx, dy = delta[0] * step, delta[1] * step
 
         if is_shift:
             # Shift: 右下角をリサイズ
-            new_x1, new_y1, new_x2, new_y2 = bbox.x1, bbox.y1, bbox.x2, bbox.y2
-
-            if key == Qt.Key_Up:
-                new_y2 -= step
-            elif key == Qt.Key_Down:
-                new_y2 += step
-            elif key == Qt.Key_Left:
-                new_x2 -= step
-            elif key == Qt.Key_Right:
-                new_x2 += step
-
-            new_bbox = BoundingBox(new_x1, new_y1, new_x2, new_y2).normalize()
-            if new_bbox.width > 10 and new_bbox.height > 10:
-                self._selected_annotation.bbox = new_bbox.clamp(
-                    self._reader.width, self._reader.height
-                )
+            new_bbox = BoundingBox(bbox.x1, bbox.y1, bbox.x2 + dx, bbox.y2 + dy).normalize()
+            if new_bbox.width <= 10 or new_bbox.height <= 10:
+                return
         else:
             # 通常: 移動
-            dx, dy = 0, 0
-
-            if key == Qt.Key_Up:
-                dy = -step
-            elif key == Qt.Key_Down:
-                dy = step
-            elif key == Qt.Key_Left:
-                dx = -step
-            elif key == Qt.Key_Right:
-                dx = step
+            new_bbox = bbox.translate(dx, dy)
+        new_bbox = new_bbox.clamp(self._reader.width, self._reader.height)
 
-            new_bbox = BoundingBox(
-                bbox.x1 + dx, bbox.y1 + dy, bbox.x2 + dx, bbox.y2 + dy
-            ).clamp(self._reader.width, self._reader.height)
+        # 画像端でクランプされ変化がない場合は再描画しない（オートリピート対策）
+        if new_bbox == bbox:
+            return
 
-            self._selected_annotation.bbox = new_bbox
+        self._selected_annotation.bbox = new_bbox
 
         # 表示更新のみ（変更通知はキーリリース時）
         self._update_display()
@@ -1114,19 +1106,11 @@ class VideoPlayerWidget(QLabel):
     ) -> None:
         """フレーム移動時の自動補間"""
         # 移動先フレームに同じtrack_idのアノテーションがあるか確認
-        existing_ann = None
-        for ann in self._annotation_store.get_frame_annotations(to_frame):
-            if ann.track_id == track_id:
-                existing_ann = ann
-                break
+        existing_ann = self._annotation_store.get_annotation_by_frame_track(to_frame, track_id)
 
         # なければ、移動元のアノテーションをコピー
         if existing_ann is None:
-            source_ann = None
-            for ann in self._annotation_store.get_frame_annotations(from_frame):
-                if ann.track_id == track_id:
-                    source_ann = ann
-                    break
+            source_ann = self._annotation_store.get_annotation_by_frame_track(from_frame, track_id)
 
             if source_ann:
                 new_ann = Annotation(
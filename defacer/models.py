@@ -1,7 +1,7 @@
 """ドメインモデル（GUIに依存しない共有データクラス）"""
 
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 
 import numpy as np
 
@@ -10,7 +10,7 @@ DEFAULT_DETECTION_THRESHOLD: float = 0.25  # 検出器レベル（YOLOへの直
 DEFAULT_UI_THRESHOLD: float = 0.5  # UIレベル（ユーザー向けデフォルト）
 
 
-@dataclass
+@dataclass(slots=True)
 class BoundingBox:
     """バウンディングボックス"""
 
@@ -146,8 +146,18 @@ class BoundingBox:
             y2=int(box1.y2 + (box2.y2 - box1.y2) * t),
         )
 
+    @classmethod
+    def interpolate_many(
+        cls, box1: "BoundingBox", box2: "BoundingBox", ts: np.ndarray
+    ) -> list["BoundingBox"]:
+        """複数の補間係数tについて一括で線形補間（interpolateと同じ切り捨て規則）"""
+        start = np.array(box1.to_tuple(), dtype=np.float64)
+        delta = np.array(box2.to_tuple(), dtype=np.float64) - start
+        coords = (start + delta * np.asarray(ts, dtype=np.float64)[:, None]).astype(np.int64)
+        return [cls(*row) for row in coords.tolist()]
+
 
-@dataclass
+@dataclass(slots=True)
 class Annotation:
     """単一のアノテーション（1フレーム、1領域）"""
 
@@ -158,9 +168,11 @@ class Annotation:
     confidence: float = 1.0
 
     def to_dict(self) -> dict:
+        # dataclasses.asdictは再帰コピーで遅く、Undo保存で全件変換されるため明示的に組み立てる
+        bbox = self.bbox
         return {
             "frame": self.frame,
-            "bbox": asdict(self.bbox),
+            "bbox": {"x1": bbox.x1, "y1": bbox.y1, "x2": bbox.x2, "y2": bbox.y2},
             "track_id": self.track_id,
             "is_manual": self.is_manual,
             "confidence": self.confidence,
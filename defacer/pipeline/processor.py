@@ -7,10 +7,14 @@ from typing import Callable, Iterator
 import numpy as np
 
 from defacer.video.reader import VideoReader
-from defacer.video.writer import export_video_with_audio, check_ffmpeg_available
+from defacer.video.writer import ENCODE_QUEUE_SIZE, export_video_with_audio, check_ffmpeg_available
 from defacer.anonymization import Anonymizer, MosaicAnonymizer
 from defacer.annotation import AnnotationStore
 
+# エクスポート時にローテーションするフレームバッファ数
+# （エンコードキュー内のフレーム + 書き込み中の1枚 + 生成中の1枚）
+EXPORT_BUFFER_COUNT = ENCODE_QUEUE_SIZE + 2
+
 
 @dataclass
 class ExportConfig:
@@ -31,6 +35,7 @@ def process_frame(
     anonymizer: Anonymizer,
     ellipse: bool = True,
     bbox_scale: float = 1.0,
+    inplace: bool = False,
 ) -> np.ndarray:
     """
     単一フレームを処理
@@ -42,6 +47,7 @@ def process_frame(
         anonymizer: 使用するAnonymizer
         ellipse: 楕円形マスクを使用するか
         bbox_scale: バウンディングボックスの拡大率
+        inplace: Trueの場合はコピーせずframeを直接書き換える
 
     Returns:
         処理後のフレーム
@@ -51,7 +57,7 @@ def process_frame(
     if not frame_annotations:
         return frame
 
-    result = frame.copy()
+    result = frame if inplace else frame.copy()
     h, w = frame.shape[:2]
 
     for ann in frame_annotations:
@@ -59,7 +65,8 @@ def process_frame(
 
         if bbox_scale != 1.0:
             bbox = bbox.scale_from_center(bbox_scale, w, h)
-        result = anonymizer.apply(result, bbox, ellipse)
+        # resultは既にこの関数が所有するバッファなので、Anonymizer側のコピーは不要
+        result = anonymizer.apply(result, bbox, ellipse, inplace=True)
 
     return result
 
@@ -70,20 +77,46 @@ def generate_processed_frames(
     anonymizer: Anonymizer,
     ellipse: bool = True,
     bbox_scale: float = 1.0,
+    buffers: list[np.ndarray] | None = None,
 ) -> Iterator[np.ndarray]:
     """
     処理済みフレームを生成するイテレータ
 
+    buffersを指定した場合は、事前確保したバッファをローテーションして
+    読み取り・匿名化をインプレースで行う（フレームごとの確保を回避）。
+    この場合、yieldされた配列は次のlen(buffers)回目の反復で上書きされるため、
+    呼び出し側は同期的に消費する必要がある。
+
     Args:
         reader: VideoReader
         annotations: アノテーションストア
         anonymizer: 使用するAnonymizer
         ellipse: 楕円形マスクを使用するか
         bbox_scale: バウンディングボックスの拡大率
+        buffers: 再利用するフレームバッファ（height x width x 3, uint8）のリスト
 
     Yields:
         処理後のフレーム
     """
+    if buffers:
+        reader.seek(0)
+        i = 0
+        while True:
+            buffer = buffers[i % len(buffers)]
+            if not reader.read_into(buffer):
+                break
+            yield process_frame(
+                buffer,
+                reader.current_frame - 1,
+                annotations,
+                anonymizer,
+                ellipse,
+                bbox_scale,
+                inplace=True,
+            )
+            i += 1
+        return
+
     for frame_number, frame in reader:
         processed = process_frame(
             frame,
@@ -130,13 +163,20 @@ def export_processed_video(
         from defacer.tracking.interpolation import interpolate_sequential_annotations
         interpolate_sequential_annotations(annotations)
 
-    with VideoReader(input_path) as reader:
+    # 先頭から順に読むだけなので、デコードもFFmpegのパイプで行う
+    with VideoReader(input_path, backend="ffmpeg") as reader:
+        # エンコードキューの上限があるため、少数のバッファを使い回せる
+        buffers = [
+            np.empty((reader.height, reader.width, 3), dtype=np.uint8)
+            for _ in range(EXPORT_BUFFER_COUNT)
+        ]
         frame_generator = generate_processed_frames(
             reader,
             annotations,
             anonymizer,
             config.ellipse,
             config.bbox_scale,
+            buffers,
         )
 
         return export_video_with_audio(
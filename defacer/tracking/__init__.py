@@ -1,5 +1,7 @@
 """トラッキングモジュール"""
 
+from functools import cache
+
 from defacer.tracking.base import FaceTracker, TrackedFace
 from defacer.tracking.interpolation import interpolate_track, interpolate_all_tracks
 
@@ -20,11 +22,19 @@ def get_available_trackers() -> list[str]:
     Returns:
         利用可能なトラッカー名のリスト（例: ["botsort", "bytetrack"]）
     """
+    if _is_ultralytics_available():
+        return ["botsort", "bytetrack"]
+    return []
+
+
+@cache
+def _is_ultralytics_available() -> bool:
+    """ultralyticsがインポート可能か確認（結果はプロセス内でキャッシュ）"""
     try:
         from ultralytics import YOLO
-        return ["botsort", "bytetrack"]
+        return True
     except ImportError:
-        return []
+        return False
 
 
 def create_tracker(tracker_type: str = "botsort", **kwargs) -> FaceTracker:
@@ -0,0 +1,72 @@
+"""統合サジェストのペアスコア計算カーネル（Numba JIT、オプション）
+
+numba がインストールされていない場合は import 時に ImportError となるため、
+呼び出し側で NumPy 実装にフォールバックすること。
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def score_pairs(
+    a_frame_max,
+    a_last_cx,
+    a_last_cy,
+    a_last_w,
+    b_frame_min,
+    b_first_cx,
+    b_first_cy,
+    b_first_w,
+    ii,
+    jj,
+    max_time_gap,
+    max_position_distance,
+    min_confidence,
+):
+    """
+    時間窓内の (ii[k], jj[k]) ペアのスコアを1パスで計算
+
+    Returns:
+        (time_gap, position_distance, confidence, valid) の配列タプル
+    """
+    n = ii.shape[0]
+    time_gap = np.empty(n, dtype=np.int64)
+    position_distance = np.zeros(n, dtype=np.float64)
+    confidence = np.zeros(n, dtype=np.float64)
+    valid = np.zeros(n, dtype=np.bool_)
+    max_squared_distance = max_position_distance * max_position_distance
+
+    for k in prange(n):
+        i = ii[k]
+        j = jj[k]
+
+        tg = b_frame_min[j] - a_frame_max[i]
+        time_gap[k] = tg
+
+        # 整数の二乗和で閾値判定し、sqrtは通過したペアのみで計算
+        dx = a_last_cx[i] - b_first_cx[j]
+        dy = a_last_cy[i] - b_first_cy[j]
+        squared_distance = dx * dx + dy * dy
+        if squared_distance > max_squared_distance:
+            continue
+
+        a_width = a_last_w[i]
+        b_width = b_first_w[j]
+        max_width = max(a_width, b_width)
+        if max_width == 0:
+            continue
+
+        pd = np.sqrt(squared_distance)
+        position_distance[k] = pd
+
+        time_score = max(0.0, 1.0 - tg / max_time_gap) * 0.4
+        position_score = max(0.0, 1.0 - pd / max_position_distance) * 0.4
+        size_score = min(a_width, b_width) / max_width * 0.15
+        movement_score = 0.05 if abs(a_width - b_width) < 20 else 0.0
+        conf = time_score + position_score + size_score + movement_score
+
+        confidence[k] = conf
+        valid[k] = conf >= min_confidence
+
+    return time_gap, position_distance, confidence, valid
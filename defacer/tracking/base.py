@@ -1,6 +1,7 @@
 """トラッキングの抽象ベースクラス"""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 
 import numpy as np
@@ -9,7 +10,7 @@ from defacer.models import BoundingBox
 from defacer.detection.base import Detection
 
 
-@dataclass
+@dataclass(slots=True)
 class TrackedFace:
     """追跡された顔を表すデータクラス"""
 
@@ -22,6 +23,33 @@ class TrackedFace:
         """Detection形式に変換"""
         return Detection(bbox=self.bbox, confidence=self.confidence)
 
+    @classmethod
+    def from_array(
+        cls, track_id: int, array, confidence: float, age: int = 0
+    ) -> "TrackedFace":
+        """xyxy形式の配列からTrackedFaceを生成"""
+        return cls(
+            track_id=track_id,
+            bbox=BoundingBox.from_xyxy(array),
+            confidence=confidence,
+            age=age,
+        )
+
+    @staticmethod
+    def stack(faces: list["TrackedFace"]) -> np.ndarray:
+        """
+        顔リストのbboxを連続した配列にまとめる
+
+        Args:
+            faces: 追跡中の顔リスト
+
+        Returns:
+            (N, 4) の int32 配列（x1, y1, x2, y2）
+        """
+        if not faces:
+            return np.empty((0, 4), dtype=np.int32)
+        return np.array([face.bbox.to_tuple() for face in faces], dtype=np.int32)
+
 
 class FaceTracker(ABC):
     """顔トラッキングの抽象ベースクラス"""
@@ -66,6 +94,24 @@ class FaceTracker(ABC):
         """
         raise NotImplementedError("統合トラッキング未対応")
 
+    def track_stream(
+        self, frames: Iterable[np.ndarray], batch: int = 8
+    ) -> Iterator[list[TrackedFace]]:
+        """
+        連続したフレームを統合トラッキングし、フレームごとの結果を順に返す
+
+        デフォルト実装はtrack()の単純なループ。サブクラスでバッチ推論に最適化可能。
+
+        Args:
+            frames: 先頭から順に並んだフレームのイテラブル
+            batch: まとめて推論するフレーム数
+
+        Yields:
+            各フレームの追跡中の顔リスト
+        """
+        for frame in frames:
+            yield self.track(frame)
+
     def supports_integrated_tracking(self) -> bool:
         """
         統合トラッキングをサポートするか
@@ -1,31 +1,86 @@
 """フレーム間補間機能"""
 
+import numpy as np
+
 from defacer.models import Annotation, BoundingBox
 from defacer.annotation import AnnotationStore
 
 
 def _interpolate_between(
-    store: AnnotationStore,
     ann1: Annotation,
     ann2: Annotation,
     track_id: int | None,
     is_manual: bool,
-) -> int:
-    """2つのアノテーション間のフレームを線形補間で埋める"""
+) -> list[Annotation]:
+    """2つのアノテーション間のフレームを線形補間したアノテーションを生成"""
     f1, f2 = ann1.frame, ann2.frame
-    count = 0
-    for frame in range(f1 + 1, f2):
-        t = (frame - f1) / (f2 - f1)
-        new_ann = Annotation(
+    if f2 - f1 <= 1:
+        return []
+
+    # 中間フレームのbboxをまとめて計算
+    ts = np.arange(1, f2 - f1) / (f2 - f1)
+    bboxes = BoundingBox.interpolate_many(ann1.bbox, ann2.bbox, ts)
+
+    return [
+        Annotation(
+            frame=frame,
+            bbox=bbox,
+            track_id=track_id,
+            is_manual=is_manual,
+            confidence=1.0,
+        )
+        for frame, bbox in zip(range(f1 + 1, f2), bboxes)
+    ]
+
+
+def _interpolate_keyframes(
+    keyframes: list[Annotation],
+    track_id: int | None,
+    is_manual: bool,
+) -> list[Annotation]:
+    """
+    時系列順のキーフレーム列の全区間を、1回の配列演算でまとめて線形補間
+
+    キーフレームのbboxを (K, 4) 配列に並べ、全区間の中間フレームについて
+    区間インデックスと補間係数を展開して一括計算する。
+    丸め規則はBoundingBox.interpolate_manyと同じ（0方向への切り捨て）。
+
+    Args:
+        keyframes: フレーム番号の昇順に並んだアノテーション
+        track_id: 生成するアノテーションのトラックID
+        is_manual: 生成するアノテーションの手動フラグ
+
+    Returns:
+        中間フレームのアノテーション（フレーム順）
+    """
+    frames = np.fromiter((ann.frame for ann in keyframes), dtype=np.int64, count=len(keyframes))
+    gaps = np.diff(frames)
+    counts = gaps - 1  # 各区間の中間フレーム数
+    total = int(counts.sum())
+    if total <= 0:
+        return []
+
+    boxes = np.array([ann.bbox.to_tuple() for ann in keyframes], dtype=np.float64)
+
+    # 中間フレームごとの区間インデックスと、区間先頭からのオフセット（1..gap-1）
+    segment = np.repeat(np.arange(len(gaps)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    ts = offsets / gaps[segment]
+
+    start = boxes[:-1][segment]
+    delta = (boxes[1:] - boxes[:-1])[segment]
+    coords = (start + delta * ts[:, None]).astype(np.int64)
+
+    return [
+        Annotation(
             frame=frame,
-            bbox=BoundingBox.interpolate(ann1.bbox, ann2.bbox, t),
+            bbox=BoundingBox(*row),
             track_id=track_id,
             is_manual=is_manual,
             confidence=1.0,
         )
-        store.add(new_ann, save_undo=False)
-        count += 1
-    return count
+        for frame, row in zip((frames[:-1][segment] + offsets).tolist(), coords.tolist())
+    ]
 
 
 def interpolate_sequential_annotations(
@@ -49,7 +104,7 @@ def interpolate_sequential_annotations(
     if len(all_frames) < 2:
         return 0
 
-    count = 0
+    new_anns: list[Annotation] = []
 
     # 連続するフレームペア間を補間
     for i in range(len(all_frames) - 1):
@@ -71,9 +126,10 @@ def interpolate_sequential_annotations(
 
         # track_idは元のアノテーションから継承（なければNone）
         track_id = ann1.track_id if ann1.track_id is not None else ann2.track_id
-        count += _interpolate_between(store, ann1, ann2, track_id, is_manual=False)
+        new_anns.extend(_interpolate_between(ann1, ann2, track_id, is_manual=False))
 
-    return count
+    # 補間結果はまとめて追加
+    return store.add_many(new_anns, save_undo=False)
 
 
 def interpolate_track(
@@ -81,6 +137,7 @@ def interpolate_track(
     track_id: int,
     start_frame: int | None = None,
     end_frame: int | None = None,
+    save_undo: bool = True,
 ) -> int:
     """
     指定トラックIDのアノテーションをフレーム間で線形補間
@@ -90,33 +147,24 @@ def interpolate_track(
         track_id: 補間するトラックID
         start_frame: 開始フレーム（Noneの場合は最初のアノテーションから）
         end_frame: 終了フレーム（Noneの場合は最後のアノテーションまで）
+        save_undo: Undoスタックに保存するか（補間するフレームがない場合は保存しない）
 
     Returns:
         追加されたアノテーション数
     """
-    # 指定トラックIDのアノテーションをインデックスから直接取得（O(1)）
-    sorted_anns = store.get_track_annotations(track_id)
+    # ストアのソート済みフレームインデックスから範囲内のフレームを取得（ソート・全件走査なし）
+    frames = store.get_track_frames_in_range(track_id, start_frame, end_frame)
 
-    if len(sorted_anns) < 2:
+    if len(frames) < 2:
         return 0
 
-    if start_frame is not None:
-        sorted_anns = [a for a in sorted_anns if a.frame >= start_frame]
-    if end_frame is not None:
-        sorted_anns = [a for a in sorted_anns if a.frame <= end_frame]
+    sorted_anns = [store.get_annotation_by_frame_track(frame, track_id) for frame in frames]
 
-    if len(sorted_anns) < 2:
-        return 0
-
-    count = 0
+    # 全区間の中間フレームを一括で補間（隣接フレームの区間は0件として扱われる）
+    new_anns = _interpolate_keyframes(sorted_anns, track_id, is_manual=True)
 
-    # 連続するフレームペア間を補間
-    for ann1, ann2 in zip(sorted_anns, sorted_anns[1:]):
-        if ann2.frame - ann1.frame <= 1:
-            continue  # 隣接フレームは補間不要
-        count += _interpolate_between(store, ann1, ann2, track_id, is_manual=True)
-
-    return count
+    # 補間結果はまとめて追加（Undo保存も1回のみ）
+    return store.add_many(new_anns, save_undo=save_undo)
 
 
 def interpolate_all_tracks(
@@ -135,11 +183,8 @@ def interpolate_all_tracks(
     Returns:
         追加されたアノテーション総数
     """
-    track_ids = store.get_all_track_ids()
-
-    total_count = 0
-    for track_id in track_ids:
-        count = interpolate_track(store, track_id, start_frame, end_frame)
-        total_count += count
-
-    return total_count
+    # 補間は既存トラックへの追加のみでトラックIDの集合は変わらないため、コピーせずに列挙
+    return sum(
+        interpolate_track(store, track_id, start_frame, end_frame, save_undo=False)
+        for track_id in store.iter_track_ids()
+    )
@@ -1,52 +1,86 @@
 """トラック統合サジェスト機能"""
 
+from collections import defaultdict
 from dataclasses import dataclass
-from defacer.models import Annotation, BoundingBox, DEFAULT_UI_THRESHOLD
+
+import numpy as np
+
+from defacer.models import BoundingBox, DEFAULT_UI_THRESHOLD
 from defacer.annotation import AnnotationStore
 
+# ペア検出で一度にブロードキャスト計算するtrack_aの行数
+_PAIR_BLOCK_SIZE = 256
+
+# 割り当て問題で候補ペアが存在しない組み合わせに与えるコスト
+_INVALID_ASSIGNMENT_COST = 1e6
+
 
 class UnionFind:
-    """Union-Find（素集合データ構造）"""
+    """Union-Find（素集合データ構造）
+
+    要素は内部で連番インデックスに変換し、parent/rankはリストで保持する。
+    """
 
     def __init__(self, elements: list):
-        self.parent = {elem: elem for elem in elements}
-        self.rank = {elem: 0 for elem in elements}
+        self.elements = list(elements)
+        self.index = {elem: i for i, elem in enumerate(self.elements)}
+        self.parent = list(range(len(self.elements)))
+        self.rank = [0] * len(self.elements)
+
+    def _find_root(self, i: int) -> int:
+        """インデックスiのルートを探索（反復的な経路圧縮）"""
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            next_i = parent[i]
+            parent[i] = root
+            i = next_i
+        return root
 
     def find(self, x):
         """ルートを探索（経路圧縮あり）"""
-        if self.parent[x] != x:
-            self.parent[x] = self.find(self.parent[x])
-        return self.parent[x]
+        return self.elements[self._find_root(self.index[x])]
 
     def union(self, x, y):
         """2つの集合を統合"""
-        root_x = self.find(x)
-        root_y = self.find(y)
+        root_x = self._find_root(self.index[x])
+        root_y = self._find_root(self.index[y])
 
         if root_x == root_y:
             return
 
         # ランクによる最適化
-        if self.rank[root_x] < self.rank[root_y]:
+        rank = self.rank
+        if rank[root_x] < rank[root_y]:
             self.parent[root_x] = root_y
-        elif self.rank[root_x] > self.rank[root_y]:
+        elif rank[root_x] > rank[root_y]:
             self.parent[root_y] = root_x
         else:
             self.parent[root_y] = root_x
-            self.rank[root_x] += 1
+            rank[root_x] += 1
 
     def get_groups(self) -> dict:
-        """グループごとに要素をまとめる"""
-        groups = {}
-        for elem in self.parent:
-            root = self.find(elem)
-            if root not in groups:
-                groups[root] = []
-            groups[root].append(elem)
-        return groups
-
-
-@dataclass
+        """グループごとに要素をまとめる（1パスで経路圧縮しながら分類）"""
+        parent = self.parent
+        elements = self.elements
+        groups = defaultdict(list)
+        for i, elem in enumerate(elements):
+            root = i
+            while parent[root] != root:
+                root = parent[root]
+            # 以降の要素が同じ経路を辿らないよう、ここで根に直結させる
+            j = i
+            while parent[j] != root:
+                next_j = parent[j]
+                parent[j] = root
+                j = next_j
+            groups[elements[root]].append(elem)
+        return dict(groups)
+
+
+@dataclass(slots=True)
 class TrackInfo:
     """トラック情報"""
 
@@ -63,8 +97,8 @@ class MergeSuggestion:
 
     track_ids: list[int]  # 統合対象トラックのリスト（時系列順）
     confidence: float  # 0.0 - 1.0（グループ全体の平均信頼度）
-    time_gaps: list[int]  # 各ペア間のフレーム差
-    position_distances: list[float]  # 各ペア間のピクセル距離
+    time_gaps: np.ndarray  # 各ペア間のフレーム差（int64）
+    position_distances: np.ndarray  # 各ペア間のピクセル距離（float64）
 
     @property
     def track_count(self) -> int:
@@ -76,47 +110,45 @@ class MergeSuggestion:
         """3つ以上のトラックを含むか"""
         return len(self.track_ids) >= 3
 
+    def to_lists(self) -> dict:
+        """配列をPythonのリストに変換した辞書を返す（JSON保存・表示用）"""
+        return {
+            "track_ids": list(self.track_ids),
+            "confidence": self.confidence,
+            "time_gaps": self.time_gaps.tolist(),
+            "position_distances": self.position_distances.tolist(),
+        }
+
 
 def collect_track_infos(store: AnnotationStore) -> list[TrackInfo]:
     """
     各トラックの情報を収集
 
+    トラックの両端はストアのフレームインデックスから直接取得する（O(トラック数)）。
+
     Args:
         store: アノテーションストア
 
     Returns:
-        トラック情報のリスト
+        トラック情報のリスト（開始フレーム順）
     """
-    track_data: dict[int, list[Annotation]] = {}
-
-    # トラックごとにアノテーションを収集
-    for ann in store:
-        if ann.track_id is None:
-            continue
-        if ann.track_id not in track_data:
-            track_data[ann.track_id] = []
-        track_data[ann.track_id].append(ann)
-
-    # TrackInfoに変換
     track_infos = []
-    for track_id, annotations in track_data.items():
-        # フレーム順にソート
-        annotations.sort(key=lambda a: a.frame)
-
-        first_ann = annotations[0]
-        last_ann = annotations[-1]
+    for track_id in store.get_all_track_ids():
+        endpoints = store.get_track_endpoints(track_id)
+        if endpoints is None:
+            continue
+        first_ann, last_ann = endpoints
 
-        track_info = TrackInfo(
+        track_infos.append(TrackInfo(
             track_id=track_id,
             frame_min=first_ann.frame,
             frame_max=last_ann.frame,
             first_bbox=first_ann.bbox,
             last_bbox=last_ann.bbox,
-        )
-        track_infos.append(track_info)
+        ))
 
     # フレーム順にソート
-    track_infos.sort(key=lambda t: t.frame_min)
+    track_infos.sort(key=lambda t: (t.frame_min, t.track_id))
 
     return track_infos
 
@@ -126,6 +158,257 @@ def _distance(p1: tuple[float, float], p2: tuple[float, float]) -> float:
     return ((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2) ** 0.5
 
 
+def _track_info_arrays(track_infos: list[TrackInfo]) -> dict[str, np.ndarray]:
+    """TrackInfoのリストを列ごとのNumPy配列（SoA）に変換"""
+    last_centers = [t.last_bbox.center for t in track_infos]
+    first_centers = [t.first_bbox.center for t in track_infos]
+    return {
+        "track_id": np.array([t.track_id for t in track_infos], dtype=np.int64),
+        "frame_min": np.array([t.frame_min for t in track_infos], dtype=np.int64),
+        "frame_max": np.array([t.frame_max for t in track_infos], dtype=np.int64),
+        "last_cx": np.array([c[0] for c in last_centers], dtype=np.int64),
+        "last_cy": np.array([c[1] for c in last_centers], dtype=np.int64),
+        "first_cx": np.array([c[0] for c in first_centers], dtype=np.int64),
+        "first_cy": np.array([c[1] for c in first_centers], dtype=np.int64),
+        "last_w": np.array([t.last_bbox.width for t in track_infos], dtype=np.int64),
+        "first_w": np.array([t.first_bbox.width for t in track_infos], dtype=np.int64),
+    }
+
+
+def _score_pairs_numpy(
+    a: dict[str, np.ndarray],
+    b: dict[str, np.ndarray],
+    ii: np.ndarray,
+    jj: np.ndarray,
+    max_time_gap: int,
+    max_position_distance: float,
+    min_confidence: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """時間窓内の (ii[k], jj[k]) ペアのスコアをNumPyで計算（_merge_kernel.score_pairsと同じ結果）"""
+    n = len(ii)
+    time_gap = b["frame_min"][jj] - a["frame_max"][ii]
+
+    # 距離は整数の二乗和で閾値判定し、sqrtは通過したペアのみで計算
+    dx = a["last_cx"][ii] - b["first_cx"][jj]
+    dy = a["last_cy"][ii] - b["first_cy"][jj]
+    squared_distance = dx * dx + dy * dy
+
+    a_width = a["last_w"][ii]
+    b_width = b["first_w"][jj]
+    max_width = np.maximum(a_width, b_width)
+
+    near = np.flatnonzero(
+        (squared_distance <= max_position_distance * max_position_distance) & (max_width != 0)
+    )
+
+    position_distance = np.zeros(n, dtype=np.float64)
+    confidence = np.zeros(n, dtype=np.float64)
+    valid = np.zeros(n, dtype=bool)
+    if len(near) == 0:
+        return time_gap, position_distance, confidence, valid
+
+    near_distance = np.sqrt(squared_distance[near])
+    near_a_width = a_width[near]
+    near_b_width = b_width[near]
+
+    # スコア計算
+    with np.errstate(divide="ignore", invalid="ignore"):
+        time_score = np.maximum(0.0, 1.0 - time_gap[near] / max_time_gap) * 0.4
+        position_score = np.maximum(0.0, 1.0 - near_distance / max_position_distance) * 0.4
+        size_score = np.minimum(near_a_width, near_b_width) / max_width[near] * 0.15
+    movement_score = np.where(np.abs(near_a_width - near_b_width) < 20, 0.05, 0.0)
+    near_confidence = time_score + position_score + size_score + movement_score
+
+    position_distance[near] = near_distance
+    confidence[near] = near_confidence
+    valid[near] = near_confidence >= min_confidence
+
+    return time_gap, position_distance, confidence, valid
+
+
+def _load_score_kernel():
+    """Numba JITカーネルを読み込む（numba未インストール時はNone）"""
+    try:
+        from defacer.tracking._merge_kernel import score_pairs
+    except ImportError:
+        return None
+    return score_pairs
+
+
+def _find_pairwise_candidates(
+    track_infos: list[TrackInfo],
+    max_time_gap: int,
+    max_position_distance: float,
+    min_confidence: float,
+    progress_callback=None,
+) -> list[tuple[int, int, float, int, float]]:
+    """
+    ペアワイズの統合候補を検出
+
+    track_a（終了フレーム順）の各行について、時間窓に入るtrack_b（開始フレーム順）の
+    列範囲 [lo, hi) をバイナリサーチで求め、窓内のペアだけを1次元配列に展開して
+    スコアをベクトル計算する。窓外のペアは一切評価しない。
+    メモリ使用量は O(ブロック内の窓内ペア数) に収まる。
+    numbaが利用可能な場合はJITカーネル（並列・1パス）でスコアを計算する。
+
+    Returns:
+        (track_a_id, track_b_id, confidence, time_gap, position_distance) のリスト
+    """
+    track_by_end_frame = sorted(track_infos, key=lambda t: t.frame_max)
+    track_by_start_frame = sorted(track_infos, key=lambda t: t.frame_min)
+    a = _track_info_arrays(track_by_end_frame)
+    b = _track_info_arrays(track_by_start_frame)
+    start_frames = b["frame_min"]
+    score_pairs = _load_score_kernel()
+
+    pairwise_candidates = []
+    total_tracks = len(track_by_end_frame)
+
+    for block_start in range(0, total_tracks, _PAIR_BLOCK_SIZE):
+        if progress_callback:
+            progress = 10 + int(block_start / total_tracks * 60)
+            progress_callback(progress, 100, f"ペア検出中 ({block_start}/{total_tracks})...")
+
+        rows = slice(block_start, block_start + _PAIR_BLOCK_SIZE)
+        frame_max = a["frame_max"][rows]
+
+        # 各track_aの終了フレーム以降、時間窓内に開始するトラックの範囲を特定
+        lo = np.searchsorted(start_frames, frame_max + 1, side="left")
+        hi = np.searchsorted(start_frames, frame_max + max_time_gap + 1, side="right")
+        counts = hi - lo
+        total_pairs = int(counts.sum())
+        if total_pairs == 0:
+            continue
+
+        # 窓内の (i, j) ペアを1次元に展開
+        ii = np.repeat(np.arange(len(frame_max)), counts)
+        row_offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        jj = np.repeat(lo, counts) + (np.arange(total_pairs) - row_offsets)
+        ii += block_start
+
+        if score_pairs is not None:
+            time_gap, position_distance, confidence, valid = score_pairs(
+                a["frame_max"], a["last_cx"], a["last_cy"], a["last_w"],
+                b["frame_min"], b["first_cx"], b["first_cy"], b["first_w"],
+                ii, jj,
+                max_time_gap, max_position_distance, min_confidence,
+            )
+        else:
+            time_gap, position_distance, confidence, valid = _score_pairs_numpy(
+                a, b, ii, jj, max_time_gap, max_position_distance, min_confidence
+            )
+
+        keep = np.flatnonzero(valid)
+        if len(keep) == 0:
+            continue
+
+        pairwise_candidates.extend(
+            zip(
+                a["track_id"][ii[keep]].tolist(),
+                b["track_id"][jj[keep]].tolist(),
+                confidence[keep].tolist(),
+                time_gap[keep].tolist(),
+                position_distance[keep].tolist(),
+            )
+        )
+
+    return pairwise_candidates
+
+
+def _load_assignment_solver():
+    """
+    割り当て問題ソルバーを読み込む
+
+    lap（Jonker-Volgenant法）を優先し、なければscipyのlinear_sum_assignmentを使う。
+
+    Returns:
+        コスト行列を受け取り (行インデックス, 列インデックス) を返す関数、
+        どちらも未インストールの場合はNone
+    """
+    try:
+        from lap import lapjv
+    except ImportError:
+        pass
+    else:
+        def solve_lapjv(cost: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+            # lapjvは正方行列が必要なため、無効コストで埋めて正方化する
+            # （extend_costの0埋めは無効コストとの桁差で解が不安定になる）
+            n_rows, n_cols = cost.shape
+            size = max(n_rows, n_cols)
+            square = np.full((size, size), _INVALID_ASSIGNMENT_COST)
+            square[:n_rows, :n_cols] = cost
+            _, row_to_col, _ = lapjv(square)
+            row_to_col = row_to_col[:n_rows]
+            rows = np.flatnonzero(row_to_col < n_cols)
+            return rows, row_to_col[rows]
+
+        return solve_lapjv
+
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:
+        return None
+    return linear_sum_assignment
+
+
+def _assign_candidates(
+    pairwise_candidates: list[tuple[int, int, float, int, float]],
+    solver,
+) -> list[tuple[int, int, float, int, float]]:
+    """
+    候補ペアを「トラック末尾 × トラック先頭」の割り当て問題として1対1に絞り込む
+
+    コストは 1 - 信頼度 とし、候補ペアの連結成分ごとにハンガリアン法で解く。
+    各トラックの後続・先行はそれぞれ高々1つになるため、採用ペアは鎖（A→B→C）を成す。
+
+    Args:
+        pairwise_candidates: (track_a_id, track_b_id, confidence, time_gap, position_distance) のリスト
+        solver: _load_assignment_solver() が返すソルバー
+
+    Returns:
+        採用された候補ペアのリスト
+    """
+    # 連結成分に分割（成分間にはペアがないため、成分ごとの最適解が全体の最適解）
+    components = UnionFind(
+        list({tid for candidate in pairwise_candidates for tid in candidate[:2]})
+    )
+    for track_a, track_b, *_ in pairwise_candidates:
+        components.union(track_a, track_b)
+
+    candidates_by_component: dict = {}
+    for candidate in pairwise_candidates:
+        root = components.find(candidate[0])
+        candidates_by_component.setdefault(root, []).append(candidate)
+
+    assigned = []
+    for candidates in candidates_by_component.values():
+        if len(candidates) == 1:
+            assigned.extend(candidates)
+            continue
+
+        tail_index = {}
+        head_index = {}
+        for track_a, track_b, *_ in candidates:
+            tail_index.setdefault(track_a, len(tail_index))
+            head_index.setdefault(track_b, len(head_index))
+
+        cost = np.full((len(tail_index), len(head_index)), _INVALID_ASSIGNMENT_COST)
+        candidate_at = {}
+        for candidate in candidates:
+            row = tail_index[candidate[0]]
+            col = head_index[candidate[1]]
+            cost[row, col] = 1.0 - candidate[2]
+            candidate_at[(row, col)] = candidate
+
+        rows, cols = solver(cost)
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            candidate = candidate_at.get((row, col))
+            if candidate is not None:
+                assigned.append(candidate)
+
+    return assigned
+
+
 def compute_merge_suggestions(
     store: AnnotationStore,
     max_time_gap: int = 60,
@@ -137,10 +420,13 @@ def compute_merge_suggestions(
     統合候補を自動検出（複数トラック対応・高速化版）
 
     時間軸インデックスを使った効率的な候補検索により、
-    O(n²)からO(n*k)に計算量を削減（kは時間窓内の平均トラック数）
+    O(n²)からO(n*k)に計算量を削減（kは時間窓内の平均トラック数）。
+    ペアごとのスコア計算はNumPyでベクトル化している。
 
     連鎖的なトラック（A→B→C→D）を自動的にグループ化して、
     複数トラックの一括統合候補として提案します。
+    lapまたはscipyが利用可能な場合は、各トラックの前後の接続先を割り当て問題で
+    1つずつに絞り込んでからグループ化します。
 
     Args:
         store: アノテーションストア
@@ -160,79 +446,20 @@ def compute_merge_suggestions(
     if len(track_infos) < 2:
         return []
 
+    # track_id -> TrackInfo の逆引き（グループ整列・ペア情報補完で使用）
+    tid_to_info = {info.track_id: info for info in track_infos}
+
     if progress_callback:
         progress_callback(10, 100, f"{len(track_infos)}トラックを分析中...")
 
-    # ステップ1: 終了フレームでソートしたインデックスを作成（高速化のため）
-    # トラックの終了フレームをキーにして、そのフレーム以降に開始するトラックを効率的に検索
-    track_by_end_frame = sorted(track_infos, key=lambda t: t.frame_max)
-    track_by_start_frame = sorted(track_infos, key=lambda t: t.frame_min)
-
-    # 各トラックの開始フレームでバイナリサーチ用のリストを作成
-    start_frames = [t.frame_min for t in track_by_start_frame]
-
-    # ステップ2: ペアワイズの統合候補を検出（最適化版）
-    pairwise_candidates = []
-
-    import bisect
-
-    total_tracks = len(track_by_end_frame)
-    for idx, track_a in enumerate(track_by_end_frame):
-        if progress_callback and idx % 100 == 0:
-            progress = 10 + int(idx / total_tracks * 60)
-            progress_callback(progress, 100, f"ペア検出中 ({idx}/{total_tracks})...")
-
-        # track_aの終了フレーム以降に開始するトラックを効率的に検索
-        search_start = track_a.frame_max + 1
-        search_end = track_a.frame_max + max_time_gap + 1
-
-        # バイナリサーチで候補範囲を特定
-        left_idx = bisect.bisect_left(start_frames, search_start)
-        right_idx = bisect.bisect_right(start_frames, search_end)
-
-        # 候補範囲内のトラックのみを検査
-        for j in range(left_idx, right_idx):
-            track_b = track_by_start_frame[j]
-
-            # 自分自身はスキップ
-            if track_b.track_id == track_a.track_id:
-                continue
-
-            time_gap = track_b.frame_min - track_a.frame_max
-
-            # 粗い位置チェック（マンハッタン距離で高速フィルタ）
-            a_center_x, a_center_y = track_a.last_bbox.center
-            b_center_x, b_center_y = track_b.first_bbox.center
-
-            manhattan_distance = abs(a_center_x - b_center_x) + abs(a_center_y - b_center_y)
-            if manhattan_distance > max_position_distance * 1.5:
-                continue
-
-            position_distance = _distance((a_center_x, a_center_y), (b_center_x, b_center_y))
-            if position_distance > max_position_distance:
-                continue
-
-            # スコア計算
-            time_score = max(0.0, 1.0 - time_gap / max_time_gap) * 0.4
-            position_score = max(0.0, 1.0 - position_distance / max_position_distance) * 0.4
-            a_width = track_a.last_bbox.width
-            b_width = track_b.first_bbox.width
-
-            max_width = max(a_width, b_width)
-            if max_width == 0:
-                continue
-
-            size_ratio = min(a_width, b_width) / max_width
-            size_score = size_ratio * 0.15
-            movement_score = 0.05 if abs(a_width - b_width) < 20 else 0.0
-            confidence = time_score + position_score + size_score + movement_score
-
-            if confidence < min_confidence:
-                continue
-
-            pairwise_candidates.append(
-                (track_a.track_id, track_b.track_id, confidence, time_gap, position_distance)
-            )
+    # ステップ1〜2: ペアワイズの統合候補を検出（NumPyによるベクトル化版）
+    pairwise_candidates = _find_pairwise_candidates(
+        track_infos,
+        max_time_gap,
+        max_position_distance,
+        min_confidence,
+        progress_callback,
+    )
 
     if progress_callback:
         progress_callback(70, 100, f"{len(pairwise_candidates)}ペアをグループ化中...")
@@ -240,7 +467,8 @@ def compute_merge_suggestions(
     if not pairwise_candidates:
         return []
 
-    # ステップ3: Union-Findでトラックをグループ化
+    # ステップ3: 割り当て問題でペアを1対1に絞り込み、Union-Findでトラックをグループ化
+    # （lap/scipyがない場合は全候補ペアを信頼度順に貪欲に結合）
     all_track_ids = [info.track_id for info in track_infos]
     uf = UnionFind(all_track_ids)
 
@@ -248,9 +476,15 @@ def compute_merge_suggestions(
     pair_info = {}
 
     for track_a, track_b, conf, tg, pd in pairwise_candidates:
-        uf.union(track_a, track_b)
         pair_info[(track_a, track_b)] = (conf, tg, pd)
 
+    solver = _load_assignment_solver()
+    if solver is not None:
+        pairwise_candidates = _assign_candidates(pairwise_candidates, solver)
+
+    for track_a, track_b, *_ in pairwise_candidates:
+        uf.union(track_a, track_b)
+
     if progress_callback:
         progress_callback(85, 100, "統合候補を生成中...")
 
@@ -258,39 +492,38 @@ def compute_merge_suggestions(
     groups = uf.get_groups()
     suggestions = []
 
-    # track_id -> frame_min のマッピング（高速化）
-    track_id_to_frame_min = {info.track_id: info.frame_min for info in track_infos}
-
     for root, group_track_ids in groups.items():
         if len(group_track_ids) < 2:
             continue
 
         # 時系列でソート（高速化版）
-        group_track_ids.sort(key=lambda tid: track_id_to_frame_min[tid])
+        group_track_ids.sort(key=lambda tid: tid_to_info[tid].frame_min)
 
-        confidences = []
-        time_gaps = []
-        position_distances = []
+        # 隣接ペアごとの値は事前確保した配列に書き込み、平均はNumPyで集計
+        link_count = len(group_track_ids) - 1
+        confidences = np.empty(link_count, dtype=np.float64)
+        time_gaps = np.empty(link_count, dtype=np.int64)
+        position_distances = np.empty(link_count, dtype=np.float64)
 
-        for i in range(len(group_track_ids) - 1):
+        for i in range(link_count):
             track_a = group_track_ids[i]
             track_b = group_track_ids[i + 1]
 
             if (track_a, track_b) in pair_info:
-                conf, tg, pd = pair_info[(track_a, track_b)]
-                confidences.append(conf)
-                time_gaps.append(tg)
-                position_distances.append(pd)
+                confidences[i], time_gaps[i], position_distances[i] = pair_info[(track_a, track_b)]
             else:
-                confidences.append(min_confidence)
-                time_gaps.append(0)
-                position_distances.append(0.0)
-
-        avg_confidence = sum(confidences) / len(confidences) if confidences else min_confidence
+                # 直接のペア候補でない隣接トラックは、実際のフレーム差・距離を記録
+                info_a = tid_to_info[track_a]
+                info_b = tid_to_info[track_b]
+                confidences[i] = min_confidence
+                time_gaps[i] = info_b.frame_min - info_a.frame_max
+                position_distances[i] = _distance(
+                    info_a.last_bbox.center, info_b.first_bbox.center
+                )
 
         suggestion = MergeSuggestion(
             track_ids=group_track_ids,
-            confidence=avg_confidence,
+            confidence=float(confidences.mean()),
             time_gaps=time_gaps,
             position_distances=position_distances,
         )
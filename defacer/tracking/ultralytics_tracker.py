@@ -1,10 +1,25 @@
 """Ultralytics YOLO 組み込みトラッキング実装"""
 
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
 import numpy as np
 
 from defacer.models import BoundingBox, DEFAULT_DETECTION_THRESHOLD
 from defacer.tracking.base import FaceTracker, TrackedFace
-from defacer.detection.base import Detection, compute_iou, find_best_iou_match
+from defacer.detection.base import Detection, compute_iou_matrix
+
+# トラッキング結果を検出結果に対応付けるのに必要なIoU
+_MATCH_IOU_THRESHOLD = 0.3
+
+
+def _load_linear_sum_assignment():
+    """scipyの割り当て問題ソルバーを読み込む（scipy未インストール時はNone）"""
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:
+        return None
+    return linear_sum_assignment
 
 
 class UltralyticsTracker(FaceTracker):
@@ -37,6 +52,57 @@ class UltralyticsTracker(FaceTracker):
         from defacer.model_loader import load_yolo_model
         self._model = load_yolo_model()
 
+    def _run_track(self, source) -> list:
+        """YOLOトラッキングを実行（sourceはフレーム1枚またはフレームのリスト）"""
+        self._ensure_initialized()
+        return self._model.track(
+            source,
+            persist=True,
+            tracker=f"{self._tracker_type}.yaml",
+            conf=self._confidence_threshold,
+            verbose=False,
+        )
+
+    @staticmethod
+    def _result_arrays(result) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        1フレーム分のトラッキング結果を列ごとの配列（SoA）に変換
+
+        Args:
+            result: YOLOのトラッキング結果（結果なしの場合はNone）
+
+        Returns:
+            (bboxes: (N, 4) int32, confidences: (N,) float64, track_ids: (N,) int64)
+        """
+        if result is not None and result.boxes is not None and result.boxes.id is not None:
+            # トラッキング時のdataは [x1, y1, x2, y2, id, conf, cls] の (N, 7) テンソル。
+            # 列ごとに転送せず、1回のデバイス→ホスト転送でまとめてCPUへ移す
+            data = result.boxes.data.cpu().numpy()
+            # 座標はBoundingBox.from_xyxyと同じく0方向への切り捨てで整数化
+            bboxes = data[:, :4].astype(np.int32)
+            track_ids = data[:, 4].astype(np.int64)
+            confidences = data[:, 5].astype(np.float64)
+            return bboxes, confidences, track_ids
+
+        return (
+            np.empty((0, 4), dtype=np.int32),
+            np.empty(0, dtype=np.float64),
+            np.empty(0, dtype=np.int64),
+        )
+
+    def _track_arrays(self, frame: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        YOLOトラッキングを実行し、結果を列ごとの配列（SoA）で返す
+
+        Args:
+            frame: 現在のフレーム
+
+        Returns:
+            (bboxes: (N, 4) int32, confidences: (N,) float64, track_ids: (N,) int64)
+        """
+        results = self._run_track(frame)
+        return self._result_arrays(results[0] if len(results) > 0 else None)
+
     def track(self, frame: np.ndarray) -> list[TrackedFace]:
         """
         検出+トラッキング統合API
@@ -47,35 +113,41 @@ class UltralyticsTracker(FaceTracker):
         Returns:
             追跡中の顔リスト
         """
-        self._ensure_initialized()
+        return self._faces_from_arrays(*self._track_arrays(frame))
 
-        # YOLO トラッキングを実行
-        results = self._model.track(
-            frame,
-            persist=True,
-            tracker=f"{self._tracker_type}.yaml",
-            conf=self._confidence_threshold,
-            verbose=False,
-        )
+    def track_stream(
+        self, frames: Iterable[np.ndarray], batch: int = 8
+    ) -> Iterator[list[TrackedFace]]:
+        """
+        連続したフレームをbatch枚ずつまとめてYOLOに渡し、フレームごとの結果を順に返す
 
-        tracked_faces = []
-        if len(results) > 0:
-            result = results[0]
-            if result.boxes is not None and result.boxes.id is not None:
-                boxes = result.boxes.xyxy.cpu().numpy()
-                confidences = result.boxes.conf.cpu().numpy()
-                track_ids = result.boxes.id.int().cpu().tolist()
-
-                for box, conf, track_id in zip(boxes, confidences, track_ids):
-                    tracked_face = TrackedFace(
-                        track_id=track_id,
-                        bbox=BoundingBox.from_xyxy(box),
-                        confidence=float(conf),
-                        age=0,
-                    )
-                    tracked_faces.append(tracked_face)
-
-        return tracked_faces
+        バッチ内のフレームは1回の推論でGPUに送られ、トラッカーには先頭から順に渡される。
+        フレームごとにtrack()を呼ぶ場合と比べ、推論呼び出しのオーバーヘッドを削減する。
+
+        Args:
+            frames: 先頭から順に並んだフレームのイテラブル
+            batch: まとめて推論するフレーム数
+
+        Yields:
+            各フレームの追跡中の顔リスト
+        """
+        frames = iter(frames)
+        while chunk := list(islice(frames, max(batch, 1))):
+            for result in self._run_track(chunk):
+                yield self._faces_from_arrays(*self._result_arrays(result))
+
+    @staticmethod
+    def _faces_from_arrays(
+        bboxes: np.ndarray, confidences: np.ndarray, track_ids: np.ndarray
+    ) -> list[TrackedFace]:
+        """配列（SoA）形式のトラッキング結果をTrackedFaceのリストに変換"""
+        # tolist()で一括してPythonのint/floatへ変換済みのため、要素ごとのint()は不要
+        return [
+            TrackedFace(track_id, BoundingBox(*box), conf)
+            for box, conf, track_id in zip(
+                bboxes.tolist(), confidences.tolist(), track_ids.tolist()
+            )
+        ]
 
     def update(
         self, detections: list[Detection], frame: np.ndarray | None = None
@@ -90,20 +162,39 @@ class UltralyticsTracker(FaceTracker):
         Returns:
             追跡中の顔リスト
         """
+        return self._faces_from_arrays(*self.update_arrays(detections, frame))
+
+    def update_arrays(
+        self, detections: list[Detection], frame: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        update()と同じ処理を行い、TrackedFaceを生成せずに配列（SoA）で返す
+
+        IDとbboxのみが必要な呼び出し側（描画など）向け。
+
+        Args:
+            detections: 現在のフレームでの検出結果
+            frame: 現在のフレーム（オプション）
+
+        Returns:
+            (bboxes: (N, 4) int32, confidences: (N,) float64, track_ids: (N,) int64)
+        """
+        det_bboxes = Detection.stack(detections)
+        det_confidences = np.fromiter(
+            (det.confidence for det in detections), dtype=np.float64, count=len(detections)
+        )
+
         if frame is None:
             # フレームがない場合は単純に連番を割り当て
-            return [
-                TrackedFace(
-                    track_id=i,
-                    bbox=det.bbox,
-                    confidence=det.confidence,
-                )
-                for i, det in enumerate(detections)
-            ]
-
-        # フレームがある場合はtrack()を実行してマッチング
-        tracked = self.track(frame)
-        return self._match_with_detections(tracked, detections)
+            return det_bboxes, det_confidences, np.arange(len(detections), dtype=np.int64)
+
+        # フレームがある場合はトラッキング結果を配列のまま検出結果とマッチング
+        bboxes, confidences, track_ids = self._track_arrays(frame)
+        if len(track_ids) == 0 or not detections:
+            return bboxes, confidences, track_ids
+
+        track_indices, det_indices = self._match_indices(bboxes, det_bboxes)
+        return det_bboxes[det_indices], det_confidences[det_indices], track_ids[track_indices]
 
     def _match_with_detections(
         self, tracked: list[TrackedFace], detections: list[Detection]
@@ -112,19 +203,86 @@ class UltralyticsTracker(FaceTracker):
         if not tracked or not detections:
             return tracked
 
+        return self._match_arrays(
+            TrackedFace.stack(tracked),
+            np.array([face.track_id for face in tracked], dtype=np.int64),
+            np.array([face.age for face in tracked], dtype=np.int64),
+            detections,
+        )
+
+    def _match_arrays(
+        self,
+        track_bboxes: np.ndarray,
+        track_ids: np.ndarray,
+        track_ages: np.ndarray,
+        detections: list[Detection],
+    ) -> list[TrackedFace]:
+        """
+        配列（SoA）形式のトラッキング結果と検出結果をIoUでマッチング
+
+        TrackedFaceは対応付けられたトラックについてのみ生成する。
+
+        Args:
+            track_bboxes: (N, 4) の xyxy 配列
+            track_ids: (N,) のトラックID配列
+            track_ages: (N,) のage配列
+            detections: 現在のフレームでの検出結果（1件以上）
+
+        Returns:
+            検出結果のbbox・信頼度を使用した顔リスト（トラック順）
+        """
+        track_indices, det_indices = self._match_indices(
+            track_bboxes, Detection.stack(detections)
+        )
+
         matched_faces = []
-        for track_face in tracked:
-            best_det = find_best_iou_match(track_face.bbox, detections, threshold=0.3)
-            if best_det is not None:
-                matched_faces.append(TrackedFace(
-                    track_id=track_face.track_id,
-                    bbox=best_det.bbox,
-                    confidence=best_det.confidence,
-                    age=track_face.age,
-                ))
+        for track_id, age, det_idx in zip(
+            track_ids[track_indices].tolist(),
+            track_ages[track_indices].tolist(),
+            det_indices.tolist(),
+        ):
+            best_det = detections[det_idx]
+            matched_faces.append(TrackedFace(
+                track_id=track_id,
+                bbox=best_det.bbox,
+                confidence=best_det.confidence,
+                age=age,
+            ))
 
         return matched_faces
 
+    @staticmethod
+    def _match_indices(
+        track_bboxes: np.ndarray, det_bboxes: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        トラックと検出をIoUで1対1に対応付け、対応するインデックスの組を返す
+
+        scipyが利用可能な場合はハンガリアン法で1対1に割り当て、
+        同じ検出が複数のトラックに使われないようにする。
+
+        Args:
+            track_bboxes: (N, 4) の xyxy 配列
+            det_bboxes: (M, 4) の xyxy 配列（1件以上）
+
+        Returns:
+            (track_indices, det_indices)（トラックの昇順、IoUが閾値未満の組は除外）
+        """
+        # 全トラック×全検出のIoUを一括計算
+        iou = compute_iou_matrix(track_bboxes, det_bboxes)
+
+        linear_sum_assignment = _load_linear_sum_assignment()
+        if linear_sum_assignment is not None:
+            # IoU総和が最大になる1対1の割り当て（行インデックスは昇順で返る）
+            track_indices, det_indices = linear_sum_assignment(-iou)
+        else:
+            # scipyがない場合は各トラックで最もIoUの高い検出を選ぶ
+            track_indices = np.arange(len(track_bboxes))
+            det_indices = iou.argmax(axis=1)
+
+        keep = iou[track_indices, det_indices] >= _MATCH_IOU_THRESHOLD
+        return track_indices[keep], det_indices[keep]
+
     def supports_integrated_tracking(self) -> bool:
         """統合トラッキングをサポート"""
         return True
@@ -0,0 +1,31 @@
+"""デコード・エンコードスレッドとのフレーム受け渡し用キュー操作"""
+
+import queue
+import threading
+
+# 停止要求を確認する間隔（秒）
+_POLL_INTERVAL = 0.1
+
+
+def put_until_stopped(frames: queue.Queue, item, stop: threading.Event) -> bool:
+    """
+    停止要求を確認しながらキューに投入
+
+    相手側のスレッドが終了してキューが空かなくなった場合でも、
+    stopが設定されれば待ち続けずに戻る。
+
+    Args:
+        frames: 投入先のキュー（上限あり）
+        item: 投入する要素
+        stop: 停止要求
+
+    Returns:
+        投入できた場合True、停止要求により中断した場合False
+    """
+    while not stop.is_set():
+        try:
+            frames.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
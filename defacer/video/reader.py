@@ -1,21 +1,126 @@
 """動画読み取りクラス"""
 
+import queue
+import subprocess
+import threading
+from functools import cache
 from pathlib import Path
 from typing import Iterator
 
 import cv2
 import numpy as np
 
+from defacer.video._frame_queue import put_until_stopped
+
+# VideoReaderで選択可能なデコードバックエンド
+READER_BACKENDS = ("opencv", "ffmpeg")
+
+
+@cache
+def _passthrough_args() -> tuple[str, ...]:
+    """
+    入力のフレームを複製・間引きせずそのまま出力させるFFmpegオプション（結果はプロセス内でキャッシュ）
+
+    可変フレームレートの動画でも、OpenCVと同じフレーム番号で読み取るために使用する。
+    -fps_mode はFFmpeg 5.1以降のみのため、使えない場合は旧来の -vsync 0 を返す。
+    """
+    try:
+        probe = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-v", "error",
+                "-f", "lavfi", "-i", "color=size=16x16:duration=0.1",
+                "-fps_mode", "passthrough",
+                "-f", "null", "-",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        return ("-vsync", "0")
+    if probe.returncode == 0:
+        return ("-fps_mode", "passthrough")
+    return ("-vsync", "0")
+
+
+class _FFmpegFrameStream:
+    """FFmpegのrawvideoパイプから連続してフレームを読み取るストリーム"""
+
+    def __init__(self, path: Path, width: int, height: int, fps: float, start_frame: int = 0):
+        """
+        Args:
+            path: 動画ファイルのパス
+            width: フレーム幅
+            height: フレーム高さ
+            fps: フレームレート（開始位置の計算に使用）
+            start_frame: 読み取りを開始するフレーム番号
+        """
+        self._frame_size = width * height * 3
+
+        cmd = ["ffmpeg", "-nostdin", "-v", "error", "-hwaccel", "auto"]
+        if start_frame > 0 and fps > 0:
+            # 目的フレームの半フレーム手前を指定し、タイムスタンプの丸めによる取りこぼしを防ぐ
+            cmd += ["-ss", f"{(start_frame - 0.5) / fps:.6f}"]
+        cmd += [
+            "-i", str(path),
+            "-an", "-sn",
+            # 可変フレームレートでもフレームの複製・間引きをさせない（フレーム番号のずれ防止）
+            *_passthrough_args(),
+            "-f", "rawvideo",
+            "-pix_fmt", "bgr24",
+            "-",
+        ]
+
+        self._process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=self._frame_size,
+        )
+
+    def read_into(self, buffer: np.ndarray) -> bool:
+        """次のフレームをバッファに直接読み取る（終端・異常終了時はFalse）"""
+        view = memoryview(buffer).cast("B")
+        filled = 0
+        while filled < self._frame_size:
+            n = self._process.stdout.readinto(view[filled:])
+            if not n:
+                return False
+            filled += n
+        return True
+
+    def close(self) -> None:
+        """FFmpegプロセスを終了"""
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.stdout.close()
+        self._process.wait()
+
 
 class VideoReader:
-    """OpenCVを使用した動画読み取りクラス"""
+    """OpenCVを使用した動画読み取りクラス
+
+    backend="ffmpeg" を指定すると、フレームのデコードをFFmpegのパイプで行う
+    （マルチスレッドデコード・利用可能ならハードウェアデコード）。
+    メタデータの取得にはOpenCVを使い、シーク時はFFmpegを指定位置から起動し直すため、
+    先頭から順に読み進める用途（エクスポート・一括検出）に向く。
+    """
 
-    def __init__(self, path: str | Path):
+    def __init__(self, path: str | Path, backend: str = "opencv", prefetch: int = 4):
         """
         Args:
             path: 動画ファイルのパス
+            backend: フレームのデコード方式（"opencv" または "ffmpeg"）
+            prefetch: イテレート時に別スレッドで先読みするフレーム数（0で先読みなし）
         """
         self.path = Path(path)
+        self._backend = backend
+        self._prefetch = prefetch
+        self._stream: _FFmpegFrameStream | None = None
+        self._cap = None
+        if backend not in READER_BACKENDS:
+            raise ValueError(f"不明なデコードバックエンド: {backend}（利用可能: {READER_BACKENDS}）")
+
         self._cap = cv2.VideoCapture(str(self.path))
         if not self._cap.isOpened():
             if not self.path.exists():
@@ -24,9 +129,13 @@ class VideoReader:
 
         self._frame_count = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
         self._fps = self._cap.get(cv2.CAP_PROP_FPS)
+        # 1フレームあたりの秒数（時間換算のたびに除算しないようキャッシュ）
+        self._frame_duration = 1.0 / self._fps if self._fps > 0 else 0.0
         self._width = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self._height = int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         self._current_frame = 0
+        # OpenCV側の読み取り位置が_current_frameと一致しているか（読み取り失敗後は不明）
+        self._cap_synced = True
 
     @property
     def frame_count(self) -> int:
@@ -48,12 +157,15 @@ class VideoReader:
         """フレーム高さ"""
         return self._height
 
+    @property
+    def frame_duration(self) -> float:
+        """1フレームあたりの秒数（FPSが不明な場合は0）"""
+        return self._frame_duration
+
     @property
     def duration(self) -> float:
         """動画の長さ（秒）"""
-        if self._fps > 0:
-            return self._frame_count / self._fps
-        return 0.0
+        return self._frame_count * self._frame_duration
 
     @property
     def current_frame(self) -> int:
@@ -70,11 +182,21 @@ class VideoReader:
         Returns:
             成功した場合True
         """
-        if 0 <= frame_number < self._frame_count:
-            self._cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            self._current_frame = frame_number
+        if not 0 <= frame_number < self._frame_count:
+            return False
+
+        # 位置はカウンタで追跡しているため、現在位置へのシーク（連続読み取り）は何もしない
+        if frame_number == self._current_frame and (self._backend == "ffmpeg" or self._cap_synced):
             return True
-        return False
+
+        if self._backend == "ffmpeg":
+            # 次の読み取りで指定位置からストリームを開き直す
+            self._close_stream()
+        else:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            self._cap_synced = True
+        self._current_frame = frame_number
+        return True
 
     def read(self) -> np.ndarray | None:
         """
@@ -83,12 +205,47 @@ class VideoReader:
         Returns:
             BGR画像、または読み取り失敗時はNone
         """
+        if self._backend == "ffmpeg":
+            frame = np.empty((self._height, self._width, 3), dtype=np.uint8)
+            return frame if self.read_into(frame) else None
+
         ret, frame = self._cap.read()
         if ret:
             self._current_frame += 1
             return frame
+        self._cap_synced = False
         return None
 
+    def read_into(self, buffer: np.ndarray) -> bool:
+        """
+        現在位置のフレームを事前確保したバッファに読み取り
+
+        Args:
+            buffer: 書き込み先のBGR画像バッファ（height x width x 3, uint8）
+
+        Returns:
+            成功した場合True
+        """
+        if self._backend == "ffmpeg":
+            if self._stream is None:
+                self._stream = _FFmpegFrameStream(
+                    self.path, self._width, self._height, self._fps, self._current_frame
+                )
+            if not self._stream.read_into(buffer):
+                return False
+            self._current_frame += 1
+            return True
+
+        ret, frame = self._cap.read(buffer)
+        if not ret:
+            self._cap_synced = False
+            return False
+        if frame is not buffer:
+            # デコーダが別領域を確保した場合はバッファへコピー
+            np.copyto(buffer, frame)
+        self._current_frame += 1
+        return True
+
     def read_frame(self, frame_number: int) -> np.ndarray | None:
         """
         指定フレームを読み取り
@@ -104,14 +261,58 @@ class VideoReader:
         return None
 
     def __iter__(self) -> Iterator[tuple[int, np.ndarray]]:
-        """フレームをイテレート"""
+        """フレームをイテレート（prefetch > 0 の場合は別スレッドでデコードを先行させる）"""
         self.seek(0)
+        if self._prefetch > 0:
+            yield from self._iter_prefetched()
+            return
+
         while True:
             frame = self.read()
             if frame is None:
                 break
             yield self._current_frame - 1, frame
 
+    def _iter_prefetched(self) -> Iterator[tuple[int, np.ndarray]]:
+        """
+        デコードスレッドと最大prefetchフレームのキューで先読みしながらイテレート
+
+        呼び出し側がフレームを処理している間に次のフレームをデコードする。
+        イテレート中にseek/readを呼んではならない。
+        """
+        frames: queue.Queue = queue.Queue(maxsize=self._prefetch)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            # 消費側が終了した場合に備え、停止要求を確認しながら投入
+            return put_until_stopped(frames, item, stop)
+
+        def decode_loop() -> None:
+            try:
+                while True:
+                    frame = self.read()
+                    if frame is None:
+                        put(None)
+                        return
+                    if not put((self._current_frame - 1, frame)):
+                        return
+            except Exception as e:
+                put(e)
+
+        thread = threading.Thread(target=decode_loop, name="VideoReaderPrefetch", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = frames.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
     def __len__(self) -> int:
         return self._frame_count
 
@@ -121,8 +322,15 @@ class VideoReader:
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         self.release()
 
+    def _close_stream(self) -> None:
+        """FFmpegストリームを閉じる"""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
     def release(self) -> None:
         """リソースを解放"""
+        self._close_stream()
         if self._cap is not None:
             self._cap.release()
             self._cap = None
@@ -1,15 +1,180 @@
 """動画出力クラス"""
 
 import logging
+import queue
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
 from pathlib import Path
 from typing import Callable, Iterator
 
-import cv2
 import numpy as np
 
+from defacer.video._frame_queue import put_until_stopped
+
 logger = logging.getLogger(__name__)
 
+# FFmpegへのパイプに設定するカーネルバッファの上限（Linuxの非特権ユーザーの既定上限）
+_PIPE_BUFFER_LIMIT = 1 << 20
+
+
+# export_video_with_audioでエンコードスレッドへ渡すフレームキューの上限
+# （フレーム生成側がバッファを使い回す場合、ENCODE_QUEUE_SIZE + 2 枚以上が必要）
+ENCODE_QUEUE_SIZE = 4
+
+# codec="auto" で優先的に使うハードウェアエンコーダ（先頭から順に試す）
+HW_ENCODERS = ("h264_nvenc", "h264_videotoolbox", "h264_qsv")
+
+# 出力コンテナごとに、再エンコードせずそのまま格納できる音声コーデック（Noneは制限なし）
+_COPYABLE_AUDIO_CODECS: dict[str, frozenset[str] | None] = {
+    ".mp4": frozenset({"aac", "mp3", "alac", "ac3", "eac3"}),
+    ".m4v": frozenset({"aac", "mp3", "alac", "ac3", "eac3"}),
+    ".mov": frozenset({"aac", "mp3", "alac", "ac3", "eac3", "pcm_s16le", "pcm_s24le"}),
+    ".mkv": None,
+}
+
+# x264のプリセット名 → NVENCのプリセット（p1: 最速 〜 p7: 最高品質）
+_NVENC_PRESETS = {
+    "ultrafast": "p1",
+    "fast": "p3",
+    "medium": "p4",
+    "slow": "p6",
+    "veryslow": "p7",
+}
+
+
+@cache
+def detect_hw_encoder() -> str | None:
+    """
+    利用可能なハードウェアH.264エンコーダを検出（結果はプロセス内でキャッシュ）
+
+    FFmpegに組み込まれているだけでなく、実際に1フレームをエンコードできるものを返す。
+
+    Returns:
+        エンコーダ名、または利用できない場合はNone
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    except FileNotFoundError:
+        return None
+
+    for encoder in HW_ENCODERS:
+        if f" {encoder} " not in result.stdout:
+            continue
+        probe = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-v", "error",
+                "-f", "lavfi", "-i", "color=size=256x256:duration=0.1",
+                "-frames:v", "1",
+                "-c:v", encoder,
+                "-f", "null", "-",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if probe.returncode == 0:
+            return encoder
+    return None
+
+
+def _video_codec_args(codec: str, crf: int, preset: str) -> list[str]:
+    """
+    FFmpegの映像エンコード引数を生成
+
+    codec="auto" の場合はハードウェアエンコーダを優先し、なければlibx264を使う。
+    ハードウェアエンコーダではcrf・presetを各エンコーダの品質指定に読み替える。
+    """
+    if codec == "auto":
+        codec = detect_hw_encoder() or "libx264"
+        logger.info("映像エンコーダ: %s", codec)
+
+    if codec == "h264_nvenc":
+        return [
+            "-c:v", codec,
+            "-preset", _NVENC_PRESETS.get(preset, "p4"),
+            "-rc", "vbr", "-cq", str(crf), "-b:v", "0",
+        ]
+    if codec == "h264_videotoolbox":
+        # -q:v は 1-100（高いほど高品質）
+        return ["-c:v", codec, "-q:v", str(max(1, min(100, 100 - crf * 2)))]
+    if codec == "h264_qsv":
+        qsv_preset = "veryfast" if preset == "ultrafast" else preset
+        return ["-c:v", codec, "-global_quality", str(crf), "-preset", qsv_preset]
+    return ["-c:v", codec, "-crf", str(crf), "-preset", preset]
+
+
+def _probe_audio_codec(path: Path) -> str | None:
+    """
+    ffprobeで先頭の音声ストリームのコーデック名を取得
+
+    Returns:
+        コーデック名、または音声がない・取得できない場合はNone
+    """
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-select_streams", "a:0",
+                "-show_entries", "stream=codec_name",
+                "-of", "csv=p=0",
+                str(path),
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def _audio_codec_args(input_path: Path, output_path: Path) -> list[str]:
+    """
+    FFmpegの音声エンコード引数を生成
+
+    元動画の音声コーデックを出力コンテナにそのまま格納できる場合はストリームコピーし、
+    音声のデコード・再エンコードを省く。判定できない場合はAACで再エンコードする。
+    """
+    allowed = _COPYABLE_AUDIO_CODECS.get(output_path.suffix.lower(), frozenset())
+    audio_codec = _probe_audio_codec(input_path)
+    if audio_codec is not None and (allowed is None or audio_codec in allowed):
+        return ["-c:a", "copy"]
+    return ["-c:a", "aac"]
+
+
+def _frame_buffer(frame: np.ndarray) -> memoryview:
+    """
+    フレームをコピーせずにパイプへ渡せるバイト列ビューを返す
+
+    C連続のuint8配列はそのままバッファプロトコルで渡し、
+    スライス等で非連続になった配列のみ連続化のためにコピーする。
+    """
+    if frame.dtype != np.uint8 or not frame.flags.c_contiguous:
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+    return memoryview(frame).cast("B")
+
+
+def _enlarge_pipe_buffer(pipe, frame_size: int) -> None:
+    """
+    パイプのカーネルバッファを拡大し、フレーム書き込み中のブロック・コンテキストスイッチを減らす
+
+    Linux以外（F_SETPIPE_SZ非対応）や上限を超える場合は何もしない。
+    """
+    try:
+        import fcntl
+
+        fcntl.fcntl(pipe.fileno(), fcntl.F_SETPIPE_SZ, min(frame_size, _PIPE_BUFFER_LIMIT))
+    except (ImportError, AttributeError, OSError):
+        pass
+
 
 class VideoWriter:
     """FFmpegを使用した動画出力クラス"""
@@ -30,7 +195,7 @@ class VideoWriter:
             width: 動画幅
             height: 動画高さ
             fps: フレームレート
-            codec: 使用するコーデック（デフォルト: libx264）
+            codec: 使用するコーデック（デフォルト: libx264、"auto"でハードウェアエンコーダを優先）
             crf: 品質（0-51、低いほど高品質、デフォルト: 18）
             preset: エンコード速度プリセット（ultrafast, fast, medium, slow, veryslow）
         """
@@ -51,15 +216,14 @@ class VideoWriter:
         cmd = [
             "ffmpeg",
             "-y",
+            "-nostats",
             "-f", "rawvideo",
             "-vcodec", "rawvideo",
             "-s", f"{self.width}x{self.height}",
             "-pix_fmt", "bgr24",
             "-r", str(self.fps),
             "-i", "-",
-            "-c:v", self.codec,
-            "-crf", str(self.crf),
-            "-preset", self.preset,
+            *_video_codec_args(self.codec, self.crf, self.preset),
             "-pix_fmt", "yuv420p",
             str(self.output_path),
         ]
@@ -70,17 +234,26 @@ class VideoWriter:
             stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
         )
+        _enlarge_pipe_buffer(self._process.stdin, self.width * self.height * 3)
 
     def write(self, frame: np.ndarray) -> None:
-        """フレームを書き込み"""
+        """
+        フレームを書き込み
+
+        Raises:
+            ValueError: フレームサイズが出力サイズと異なる場合（リサイズは呼び出し側で行う）
+        """
         if self._process is None:
             raise RuntimeError("VideoWriterが開かれていません")
 
         if frame.shape[:2] != (self.height, self.width):
-            frame = cv2.resize(frame, (self.width, self.height))
+            raise ValueError(
+                f"フレームサイズが出力サイズと一致しません: "
+                f"{frame.shape[1]}x{frame.shape[0]}（期待値: {self.width}x{self.height}）"
+            )
 
         try:
-            self._process.stdin.write(memoryview(frame))
+            self._process.stdin.write(_frame_buffer(frame))
         except BrokenPipeError:
             stderr = self._process.stderr.read().decode(errors="replace") if self._process.stderr else ""
             raise RuntimeError(f"FFmpegプロセスが異常終了しました: {stderr}") from None
@@ -132,6 +305,11 @@ def export_video_with_audio(
     """
     音声付きで動画をエクスポート（単一パス）
 
+    元動画の音声は、出力コンテナに格納できるコーデックであれば再エンコードせずコピーする。
+    FFmpegへの書き込みはエンコードスレッドで行い、最大ENCODE_QUEUE_SIZEフレームを
+    キューに保持するため、frame_generatorがバッファを使い回す場合は
+    ENCODE_QUEUE_SIZE + 2 枚以上のバッファをローテーションすること。
+
     Args:
         input_path: 入力動画パス（音声ソース）
         output_path: 出力動画パス
@@ -140,13 +318,16 @@ def export_video_with_audio(
         fps: フレームレート
         width: 動画幅
         height: 動画高さ
-        codec: 使用するコーデック
+        codec: 使用するコーデック（"auto"でハードウェアエンコーダを優先）
         crf: 品質
         preset: エンコード速度プリセット
         progress_callback: 進捗コールバック(current, total)
 
     Returns:
         成功した場合True
+
+    Raises:
+        ValueError: フレームサイズがwidth x heightと異なる場合
     """
     input_path = Path(input_path)
     output_path = Path(output_path)
@@ -155,6 +336,7 @@ def export_video_with_audio(
     cmd = [
         "ffmpeg",
         "-y",
+        "-nostats",
         "-f", "rawvideo",
         "-vcodec", "rawvideo",
         "-s", f"{width}x{height}",
@@ -162,11 +344,9 @@ def export_video_with_audio(
         "-r", str(fps),
         "-i", "-",
         "-i", str(input_path),
-        "-c:v", codec,
-        "-crf", str(crf),
-        "-preset", preset,
+        *_video_codec_args(codec, crf, preset),
         "-pix_fmt", "yuv420p",
-        "-c:a", "aac",
+        *_audio_codec_args(input_path, output_path),
         "-map", "0:v:0",
         "-map", "1:a:0?",
         "-shortest",
@@ -179,19 +359,57 @@ def export_video_with_audio(
         stdout=subprocess.DEVNULL,
         stderr=subprocess.PIPE,
     )
+    _enlarge_pipe_buffer(process.stdin, width * height * 3)
+
+    # フレーム生成（匿名化）とFFmpegへの書き込みを別スレッドで重ねて実行する
+    frames: queue.Queue = queue.Queue(maxsize=ENCODE_QUEUE_SIZE)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # エンコードスレッドが終了した場合に備え、停止要求を確認しながら投入
+        return put_until_stopped(frames, item, stop)
+
+    def encode_loop() -> None:
+        # どのような理由で終了しても生成側のput()が待ち続けないよう、必ず停止要求を出す
+        # （BrokenPipeError以外の例外はFutureに保存され、生成側のencoder.result()で再送出される）
+        try:
+            while not stop.is_set():
+                try:
+                    frame = frames.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if frame is None:
+                    return
+                try:
+                    process.stdin.write(_frame_buffer(frame))
+                except BrokenPipeError:
+                    # FFmpegが異常終了した場合は生成側も停止させ、終了コードで判定する
+                    return
+        finally:
+            stop.set()
 
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="FFmpegEncode")
     try:
+        encoder = executor.submit(encode_loop)
         for i, frame in enumerate(frame_generator):
             if frame.shape[:2] != (height, width):
-                frame = cv2.resize(frame, (width, height))
-            try:
-                process.stdin.write(memoryview(frame))
-            except BrokenPipeError:
+                raise ValueError(
+                    f"フレームサイズが出力サイズと一致しません: "
+                    f"{frame.shape[1]}x{frame.shape[0]}（期待値: {width}x{height}）"
+                )
+            if not put(frame):
                 break
             if progress_callback:
                 progress_callback(i + 1, total_frames)
+        put(None)
+        # エンコードスレッドの終了を待ち、スレッド内で発生した例外はここで再送出する
+        encoder.result()
 
-        process.stdin.close()
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            # FFmpegが先に終了している場合は、終了コードでエラーを判定する
+            pass
         stderr_output = process.stderr.read().decode(errors="replace") if process.stderr else ""
         returncode = process.wait()
 
@@ -200,10 +418,13 @@ def export_video_with_audio(
             return False
         return True
 
-    except Exception:
+    except BaseException:
+        stop.set()
         process.kill()
         process.wait()
         raise
+    finally:
+        executor.shutdown(wait=True)
 
 
 def check_ffmpeg_available() -> bool:
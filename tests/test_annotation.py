@@ -4,13 +4,17 @@ import pytest
 from defacer.gui.annotation import AnnotationStore, Annotation, BoundingBox
 
 
+@pytest.fixture(name="store")
+def empty_store():
+    """テストごとに新しい空のAnnotationStore"""
+    return AnnotationStore()
+
+
 class TestDuplicatePrevention:
     """重複防止機能のテスト"""
 
-    def test_add_duplicate_updates_existing(self):
+    def test_add_duplicate_updates_existing(self, store):
         """同一(frame, track_id)のaddで既存が更新されること"""
-        store = AnnotationStore()
-
         # 最初のアノテーションを追加
         ann1 = Annotation(
             frame=10,
@@ -45,36 +49,41 @@ class TestDuplicatePrevention:
         # 総カウントも1であるべき
         assert len(store) == 1
 
-    def test_add_none_track_id_allows_duplicates(self):
-        """track_id=Noneは重複チェック対象外"""
-        store = AnnotationStore()
-
-        # track_id=Noneのアノテーションを複数追加
-        ann1 = Annotation(
-            frame=10,
-            bbox=BoundingBox(10, 10, 50, 50),
-            track_id=None,
-            is_manual=True,
-        )
-        ann2 = Annotation(
-            frame=10,
-            bbox=BoundingBox(20, 20, 60, 60),
-            track_id=None,
-            is_manual=True,
-        )
-
-        store.add(ann1, save_undo=False)
-        store.add(ann2, save_undo=False)
-
-        # 両方追加されるべき
-        anns = store.get_frame_annotations(10)
-        assert len(anns) == 2
-        assert len(store) == 2
-
-    def test_rebuild_cache_removes_duplicates(self):
+    @pytest.mark.parametrize(
+        "annotations, expected_counts",
+        [
+            # track_id=Noneは重複チェック対象外
+            pytest.param([(10, None), (10, None)], {10: 2}, id="none_track_id_allows_duplicates"),
+            # 同じフレームに異なるtrack_idは追加可能
+            pytest.param([(10, 1), (10, 2), (10, 3)], {10: 3}, id="different_tracks_same_frame"),
+            # 同じtrack_idの異なるフレームは追加可能
+            pytest.param(
+                [(10, 1), (20, 1), (30, 1)], {10: 1, 20: 1, 30: 1}, id="same_track_different_frames"
+            ),
+        ],
+    )
+    def test_add_and_count(self, store, annotations, expected_counts):
+        """(frame, track_id)が重複しないアノテーションはすべて追加されること"""
+        for i, (frame, track_id) in enumerate(annotations):
+            offset = 10 * i
+            store.add(
+                Annotation(
+                    frame=frame,
+                    bbox=BoundingBox(10 + offset, 10 + offset, 50 + offset, 50 + offset),
+                    track_id=track_id,
+                ),
+                save_undo=False,
+            )
+
+        for frame, count in expected_counts.items():
+            assert len(store.get_frame_annotations(frame)) == count
+        for frame, track_id in annotations:
+            if track_id is not None:
+                assert store.get_annotation_by_frame_track(frame, track_id) is not None
+        assert len(store) == len(annotations)
+
+    def test_rebuild_cache_removes_duplicates(self, store):
         """_rebuild_cache()で重複が除去されること"""
-        store = AnnotationStore()
-
         # 内部データに直接重複を作成
         ann1 = Annotation(frame=10, bbox=BoundingBox(10, 10, 50, 50), track_id=1)
         ann2 = Annotation(frame=10, bbox=BoundingBox(20, 20, 60, 60), track_id=1)
@@ -86,19 +95,15 @@ class TestDuplicatePrevention:
         store._rebuild_cache()
 
         # 重複が除去され、先勝ちでann1が残るべき
-        anns = store.get_frame_annotations(10)
-        assert len(anns) == 2
-        assert ann1 in anns
-        assert ann2 not in anns
-        assert ann3 in anns
+        assert len(store.get_frame_annotations(10)) == 2
+        assert store.get_annotation_by_frame_track(10, 1) is ann1
+        assert store.get_annotation_by_frame_track(10, 2) is ann3
 
         # 総カウントも正しく更新されるべき
         assert len(store) == 2
 
-    def test_merge_tracks_handles_conflicts(self):
+    def test_merge_tracks_handles_conflicts(self, store):
         """merge_tracks()で衝突フレームが処理されること"""
-        store = AnnotationStore()
-
         # source_track_id=1のアノテーション
         store.add(
             Annotation(frame=10, bbox=BoundingBox(10, 10, 50, 50), track_id=1),
@@ -145,6 +150,15 @@ class TestDuplicatePrevention:
         # track_id=1は消滅
         assert 1 not in store.get_all_track_ids()
 
+        # 衝突で削除されたアノテーションはインデックスからも消え、再追加は新規扱いになる
+        assert store.get_annotation_by_frame_track(20, 1) is None
+        store.add(
+            Annotation(frame=20, bbox=BoundingBox(0, 0, 5, 5), track_id=1),
+            save_undo=False,
+        )
+        assert len(store.get_frame_annotations(20)) == 2
+        assert len(store) == 5
+
     def test_from_dict_cleans_duplicates(self):
         """JSONに重複がある場合のクリーニング"""
         # 重複を含むJSONデータ
@@ -189,43 +203,8 @@ class TestDuplicatePrevention:
         assert len(track1_anns) == 1
         assert track1_anns[0].bbox.x1 == 10  # 最初のものが残る
 
-    def test_different_tracks_same_frame_allowed(self):
-        """同じフレームに異なるtrack_idは追加可能"""
-        store = AnnotationStore()
-
-        ann1 = Annotation(frame=10, bbox=BoundingBox(10, 10, 50, 50), track_id=1)
-        ann2 = Annotation(frame=10, bbox=BoundingBox(20, 20, 60, 60), track_id=2)
-        ann3 = Annotation(frame=10, bbox=BoundingBox(30, 30, 70, 70), track_id=3)
-
-        store.add(ann1, save_undo=False)
-        store.add(ann2, save_undo=False)
-        store.add(ann3, save_undo=False)
-
-        anns = store.get_frame_annotations(10)
-        assert len(anns) == 3
-        assert len(store) == 3
-
-    def test_same_track_different_frames_allowed(self):
-        """同じtrack_idの異なるフレームは追加可能"""
-        store = AnnotationStore()
-
-        ann1 = Annotation(frame=10, bbox=BoundingBox(10, 10, 50, 50), track_id=1)
-        ann2 = Annotation(frame=20, bbox=BoundingBox(20, 20, 60, 60), track_id=1)
-        ann3 = Annotation(frame=30, bbox=BoundingBox(30, 30, 70, 70), track_id=1)
-
-        store.add(ann1, save_undo=False)
-        store.add(ann2, save_undo=False)
-        store.add(ann3, save_undo=False)
-
-        assert len(store.get_frame_annotations(10)) == 1
-        assert len(store.get_frame_annotations(20)) == 1
-        assert len(store.get_frame_annotations(30)) == 1
-        assert len(store) == 3
-
-    def test_integration_retrack_scenario(self):
+    def test_integration_retrack_scenario(self, store):
         """再トラッキングシナリオの統合テスト"""
-        store = AnnotationStore()
-
         # 初期状態: track_id=1のアノテーション
         ann1 = Annotation(frame=10, bbox=BoundingBox(10, 10, 50, 50), track_id=1)
         ann2 = Annotation(frame=20, bbox=BoundingBox(20, 20, 60, 60), track_id=1)
@@ -245,12 +224,10 @@ class TestDuplicatePrevention:
         assert 10 in store.get_all_track_ids()
         assert 1 not in store.get_all_track_ids()
 
-    def test_integration_interpolation_with_duplicates(self):
+    def test_integration_interpolation_with_duplicates(self, store):
         """補間操作で重複が発生しないことを確認"""
         from defacer.tracking.interpolation import interpolate_track
 
-        store = AnnotationStore()
-
         # キーフレーム
         ann1 = Annotation(frame=10, bbox=BoundingBox(10, 10, 50, 50), track_id=1)
         ann2 = Annotation(frame=20, bbox=BoundingBox(30, 30, 70, 70), track_id=1)
@@ -273,3 +250,156 @@ class TestDuplicatePrevention:
             anns = store.get_frame_annotations(frame)
             track1_anns = [ann for ann in anns if ann.track_id == 1]
             assert len(track1_anns) == 1, f"2回目補間後、フレーム{frame}でtrack_id=1の重複発生"
+
+
+class TestTrackFrameIndex:
+    """トラックごとのソート済みフレームインデックスのテスト"""
+
+    def _make_store(self, frames):
+        store = AnnotationStore()
+        track_id = store.new_track_id()
+        for frame in frames:
+            store.add(
+                Annotation(frame=frame, bbox=BoundingBox(10, 10, 50, 50), track_id=track_id),
+                save_undo=False,
+            )
+        return store
+
+    def test_frames_kept_sorted_on_add_and_remove(self):
+        """追加・削除後もフレームがソート順で保持されること"""
+        store = self._make_store([30, 10, 20, 40])
+        assert store.get_track_frames(1) == [10, 20, 30, 40]
+
+        ann = store.get_annotation_by_frame_track(20, 1)
+        store.remove_annotation(ann, save_undo=False)
+        assert store.get_track_frames(1) == [10, 30, 40]
+
+        store.remove_range(35, 50, save_undo=False)
+        assert store.get_track_frames(1) == [10, 30]
+
+    def test_range_lookup(self):
+        """範囲検索"""
+        store = self._make_store([10, 20, 30, 40])
+
+        assert store.get_track_frames_in_range(1, 15, 35) == [20, 30]
+        assert store.get_track_frames_in_range(1, 20, 30) == [20, 30]
+        assert store.get_track_frames_in_range(2, 0, 100) == []
+
+    def test_split_and_merge_update_frames(self):
+        """分割・統合でフレームインデックスが更新されること"""
+        store = self._make_store([10, 20, 30, 40])
+
+        new_track_id = store.split_track(1, 25, save_undo=False)
+        assert store.get_track_frames(1) == [10, 20]
+        assert store.get_track_frames(new_track_id) == [30, 40]
+
+        store.merge_tracks(new_track_id, 1, save_undo=False)
+        assert store.get_track_frames(1) == [10, 20, 30, 40]
+        assert store.get_track_frames(new_track_id) == []
+
+        info = store.get_track_info(1)
+        assert info["frame_min"] == 10
+        assert info["frame_max"] == 40
+        assert info["frame_count"] == 4
+
+    def test_undo_rebuilds_frames(self):
+        """Undoでフレームインデックスが再構築されること"""
+        store = self._make_store([10, 20])
+        store.remove_track(1)
+        assert store.get_track_frames(1) == []
+
+        store.undo()
+        assert store.get_track_frames(1) == [10, 20]
+
+    def test_track_ids_follow_reference_count(self):
+        """トラックIDの一覧が追加・削除・統合に追従すること"""
+        store = self._make_store([10, 20])
+        track_ids = store.get_all_track_ids()
+        assert track_ids == {1}
+
+        store.add(Annotation(frame=5, bbox=BoundingBox(0, 0, 10, 10), track_id=3), save_undo=False)
+        assert track_ids == {1, 3}
+
+        store.merge_tracks(3, 1, save_undo=False)
+        assert track_ids == {1}
+
+        store.remove_track(1, save_undo=False)
+        assert len(track_ids) == 0
+
+    def test_track_id_outside_packed_key_range(self):
+        """intキーに収まらないトラックIDも、他のキーと衝突せずに扱えること"""
+        store = self._make_store([1])
+        large_id = 1 << 24  # (0 << 24) | large_id は (1 << 24) | 0 と同じ値になる
+        for track_id, frame in ((0, 1), (large_id, 0), (-1, 1)):
+            store.add(
+                Annotation(frame=frame, bbox=BoundingBox(0, 0, 10, 10), track_id=track_id),
+                save_undo=False,
+            )
+
+        assert len(store) == 4
+        assert store.get_annotation_by_frame_track(1, 0).track_id == 0
+        assert store.get_annotation_by_frame_track(0, large_id).track_id == large_id
+        assert store.get_annotation_by_frame_track(1, -1).track_id == -1
+        assert store.get_annotation_by_frame_track(0, 0) is None
+
+        restored = AnnotationStore.from_dict(store.to_dict())
+        assert len(restored) == 4
+        assert restored.get_track_frames(large_id) == [0]
+
+    def test_lookup_with_none_track_id(self):
+        """track_idがNoneの検索はNoneを返すこと"""
+        store = AnnotationStore()
+        store.add(Annotation(frame=10, bbox=BoundingBox(0, 0, 10, 10), track_id=None), save_undo=False)
+        assert store.get_annotation_by_frame_track(10, None) is None
+
+
+class TestAddMany:
+    """一括追加のテスト"""
+
+    def test_add_many_matches_add(self):
+        """add_manyがaddの繰り返しと同じ結果になること"""
+        anns = [
+            Annotation(frame=30, bbox=BoundingBox(10, 10, 50, 50), track_id=1),
+            Annotation(frame=10, bbox=BoundingBox(10, 10, 50, 50), track_id=1),
+            Annotation(frame=10, bbox=BoundingBox(20, 20, 60, 60), track_id=2),
+            Annotation(frame=10, bbox=BoundingBox(30, 30, 70, 70), track_id=None),
+            Annotation(frame=30, bbox=BoundingBox(40, 40, 80, 80), track_id=1),  # 重複 → 更新
+        ]
+
+        store = AnnotationStore()
+        added = store.add_many(anns, save_undo=False)
+
+        assert added == 4
+        assert len(store) == 4
+        assert store.get_track_frames(1) == [10, 30]
+        assert store.get_annotation_by_frame_track(30, 1).bbox.x1 == 40
+        assert store.get_all_track_ids() == {1, 2}
+
+    def test_add_many_single_undo(self):
+        """add_manyはUndo1回で元に戻ること"""
+        store = AnnotationStore()
+        store.add_many(
+            [Annotation(frame=f, bbox=BoundingBox(10, 10, 50, 50), track_id=1) for f in range(5)]
+        )
+        assert len(store) == 5
+
+        store.undo()
+        assert len(store) == 0
+
+    def test_add_many_wrong_type_track_id_leaves_store_unchanged(self):
+        """整数でない型のtrack_idを含む場合は、何も変更せずに例外になること"""
+        store = AnnotationStore()
+        store.add(Annotation(frame=0, bbox=BoundingBox(0, 0, 10, 10), track_id=1), save_undo=False)
+        before = store.to_dict()
+
+        with pytest.raises(TypeError):
+            store.add_many([
+                Annotation(frame=5, bbox=BoundingBox(0, 0, 10, 10), track_id=1),
+                Annotation(frame=5, bbox=BoundingBox(0, 0, 10, 10), track_id="2"),
+            ])
+
+        assert store.to_dict() == before
+        assert len(store) == 1
+        assert store.get_track_frames(1) == [0]
+        assert store.get_all_track_ids() == {1}
+        assert not store.undo()
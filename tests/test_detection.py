@@ -0,0 +1,95 @@
+"""検出共通処理のテスト"""
+
+import numpy as np
+import pytest
+
+from defacer.detection import base as detection_base
+from defacer.detection.base import (
+    Detection,
+    compute_iou_matrix,
+    find_best_iou_match,
+    find_best_iou_matches,
+)
+from defacer.models import BoundingBox
+
+
+class TestComputeIouMatrix:
+    """compute_iou_matrixのテスト"""
+
+    @pytest.fixture(params=["kernel", "numpy"], autouse=True)
+    def iou_backend(self, request, monkeypatch):
+        """numbaカーネルとNumPy実装の両方で検証"""
+        if request.param == "numpy":
+            monkeypatch.setattr(detection_base, "_load_iou_kernel", lambda: None)
+        elif detection_base._load_iou_kernel() is None:
+            pytest.skip("numbaが未インストール")
+
+    def test_matches_bounding_box_iou(self):
+        """BoundingBox.iouと同じ値になること（重なりなし・接触・退化ボックスを含む）"""
+        boxes1 = [
+            BoundingBox(0, 0, 10, 10),
+            BoundingBox(5, 5, 15, 15),
+            BoundingBox(20, 20, 20, 30),
+        ]
+        boxes2 = [
+            BoundingBox(0, 0, 10, 10),
+            BoundingBox(10, 0, 20, 10),
+            BoundingBox(8, 2, 30, 12),
+            BoundingBox(100, 100, 110, 110),
+        ]
+
+        iou = compute_iou_matrix(
+            np.array([b.to_tuple() for b in boxes1]),
+            np.array([b.to_tuple() for b in boxes2]),
+        )
+
+        assert iou.shape == (3, 4)
+        for i, a in enumerate(boxes1):
+            for j, b in enumerate(boxes2):
+                assert iou[i, j] == a.iou(b)
+
+    def test_empty_input(self):
+        """片方が空の場合は空の行列になること"""
+        iou = compute_iou_matrix(np.empty((0, 4)), np.array([[0, 0, 10, 10]]))
+        assert iou.shape == (0, 1)
+
+
+class TestDetectionStack:
+    """Detection.stackのテスト"""
+
+    def test_stack(self):
+        detections = [
+            Detection(bbox=BoundingBox(1, 2, 3, 4), confidence=0.9),
+            Detection(bbox=BoundingBox(10, 20, 30, 40), confidence=0.5),
+        ]
+        stacked = Detection.stack(detections)
+        assert stacked.dtype == np.int32
+        assert stacked.tolist() == [[1, 2, 3, 4], [10, 20, 30, 40]]
+
+    def test_stack_empty(self):
+        assert Detection.stack([]).shape == (0, 4)
+
+
+class TestFindBestIouMatches:
+    """find_best_iou_matchesのテスト"""
+
+    def test_matches_scalar_version(self):
+        """対象ごとにfind_best_iou_matchを呼んだ場合と同じ候補を選ぶこと"""
+        rng = np.random.default_rng(0)
+        xy = rng.integers(0, 100, size=(40, 2))
+        wh = rng.integers(1, 40, size=(40, 2))
+        bboxes = [BoundingBox(*map(int, (*p, *(p + s)))) for p, s in zip(xy, wh)]
+        targets = [Detection(bbox=b, confidence=1.0) for b in bboxes[:15]]
+        candidates = [Detection(bbox=b, confidence=1.0) for b in bboxes[15:]]
+
+        matches = find_best_iou_matches(
+            Detection.stack(targets), Detection.stack(candidates), threshold=0.1
+        )
+
+        for target, match in zip(targets, matches.tolist()):
+            expected = find_best_iou_match(target.bbox, candidates, threshold=0.1)
+            assert (candidates[match] if match >= 0 else None) is expected
+
+    def test_no_candidates(self):
+        matches = find_best_iou_matches(np.array([[0, 0, 10, 10]]), np.empty((0, 4)))
+        assert matches.tolist() == [-1]
@@ -0,0 +1,109 @@
+"""トラック統合サジェスト機能のテスト"""
+
+import pytest
+
+from defacer.annotation import AnnotationStore
+from defacer.models import Annotation, BoundingBox
+from defacer.tracking.merge_suggestion import (
+    UnionFind,
+    _load_assignment_solver,
+    collect_track_infos,
+    compute_merge_suggestions,
+)
+
+
+def _add_track(store, track_id, start_frame, end_frame, x, y, size=40):
+    """開始・終了フレームに同じ位置のアノテーションを持つトラックを追加"""
+    for frame in (start_frame, end_frame):
+        store.add(
+            Annotation(
+                frame=frame,
+                bbox=BoundingBox(x, y, x + size, y + size),
+                track_id=track_id,
+            ),
+            save_undo=False,
+        )
+
+
+class TestComputeMergeSuggestions:
+    """compute_merge_suggestionsのテスト"""
+
+    def test_chain_is_grouped(self):
+        """連続するトラック（A→B→C）が1つの候補にまとめられること"""
+        store = AnnotationStore()
+        _add_track(store, 1, 0, 10, 100, 100)
+        _add_track(store, 2, 15, 30, 105, 100)
+        _add_track(store, 3, 35, 50, 110, 100)
+
+        suggestions = compute_merge_suggestions(store)
+
+        assert len(suggestions) == 1
+        assert suggestions[0].track_ids == [1, 2, 3]
+        assert suggestions[0].time_gaps.tolist() == [5, 5]
+        assert suggestions[0].is_multi_track
+
+    def test_far_or_overlapping_tracks_not_suggested(self):
+        """位置が離れたトラック・時間が重なるトラックは候補にならないこと"""
+        store = AnnotationStore()
+        _add_track(store, 1, 0, 10, 0, 0)
+        _add_track(store, 2, 15, 30, 500, 500)  # 位置が遠い
+        _add_track(store, 3, 5, 20, 0, 0)  # 時間が重なる
+
+        assert compute_merge_suggestions(store) == []
+
+    def test_time_gap_limit(self):
+        """max_time_gapを超えるトラックは候補にならないこと"""
+        store = AnnotationStore()
+        _add_track(store, 1, 0, 10, 100, 100)
+        _add_track(store, 2, 100, 110, 100, 100)
+
+        assert compute_merge_suggestions(store, max_time_gap=60) == []
+        assert len(compute_merge_suggestions(store, max_time_gap=200, min_confidence=0.3)) == 1
+
+    def test_assignment_keeps_one_successor(self):
+        """1つのトラックに後続候補が複数ある場合、最も信頼度の高い1つだけと結合されること"""
+        if _load_assignment_solver() is None:
+            pytest.skip("lap/scipyが未インストール")
+        store = AnnotationStore()
+        _add_track(store, 1, 0, 10, 100, 100)
+        _add_track(store, 2, 15, 30, 105, 100)
+        _add_track(store, 3, 15, 30, 160, 100)
+
+        suggestions = compute_merge_suggestions(store)
+
+        assert [s.track_ids for s in suggestions] == [[1, 2]]
+
+
+class TestCollectTrackInfos:
+    """collect_track_infosのテスト"""
+
+    def test_endpoints_follow_store(self):
+        """両端のフレーム・bboxがストアの最新状態（bboxの直接編集を含む）から取得されること"""
+        store = AnnotationStore()
+        _add_track(store, 1, 0, 10, 100, 100)
+        _add_track(store, 2, 15, 30, 105, 100)
+        collect_track_infos(store)
+
+        # 終了フレームの延長と、bboxの直接編集（GUIのドラッグ相当）
+        _add_track(store, 1, 0, 12, 100, 100)
+        store.get_annotation_by_frame_track(30, 2).bbox = BoundingBox(0, 0, 10, 10)
+        _add_track(store, 3, 40, 50, 0, 0)
+        infos = collect_track_infos(store)
+
+        assert [info.track_id for info in infos] == [1, 2, 3]
+        assert infos[0].frame_max == 12
+        assert infos[1].last_bbox == BoundingBox(0, 0, 10, 10)
+
+
+class TestUnionFind:
+    """UnionFindのテスト"""
+
+    def test_groups(self):
+        uf = UnionFind([1, 2, 3, 4, 5])
+        uf.union(1, 2)
+        uf.union(2, 3)
+        uf.union(4, 5)
+
+        groups = sorted(sorted(g) for g in uf.get_groups().values())
+        assert groups == [[1, 2, 3], [4, 5]]
+        assert uf.find(3) == uf.find(1)
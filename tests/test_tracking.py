@@ -0,0 +1,175 @@
+"""トラッキング処理のテスト"""
+
+import numpy as np
+import pytest
+
+from defacer.annotation import AnnotationStore
+from defacer.detection.base import Detection
+from defacer.models import Annotation, BoundingBox
+from defacer.tracking.base import TrackedFace
+from defacer.tracking.interpolation import interpolate_track
+from defacer.tracking.ultralytics_tracker import UltralyticsTracker
+
+
+class TestMatchWithDetections:
+    """UltralyticsTracker._match_with_detectionsのテスト"""
+
+    def test_one_detection_per_track(self):
+        """近接する2トラックにそれぞれ別の検出が割り当てられること"""
+        pytest.importorskip("scipy")
+        tracked = [
+            TrackedFace(track_id=1, bbox=BoundingBox(0, 0, 10, 10), confidence=0.5),
+            TrackedFace(track_id=2, bbox=BoundingBox(2, 0, 12, 10), confidence=0.5),
+        ]
+        detections = [
+            Detection(bbox=BoundingBox(1, 0, 11, 10), confidence=0.9),
+            Detection(bbox=BoundingBox(3, 0, 13, 10), confidence=0.8),
+        ]
+
+        matched = UltralyticsTracker()._match_with_detections(tracked, detections)
+
+        assert [(face.track_id, face.bbox) for face in matched] == [
+            (1, BoundingBox(1, 0, 11, 10)),
+            (2, BoundingBox(3, 0, 13, 10)),
+        ]
+
+    def test_low_iou_is_dropped(self):
+        """IoUが閾値未満のトラックは結果に含まれないこと"""
+        tracked = [TrackedFace(track_id=1, bbox=BoundingBox(0, 0, 10, 10), confidence=0.5)]
+        detections = [Detection(bbox=BoundingBox(50, 50, 60, 60), confidence=0.9)]
+
+        assert UltralyticsTracker()._match_with_detections(tracked, detections) == []
+
+
+class TestTrackStream:
+    """UltralyticsTracker.track_streamのテスト"""
+
+    def test_batches_frames_in_order(self):
+        """フレームをbatch枚ずつ順にまとめて推論し、フレームごとに結果を返すこと"""
+
+        class FakeResult:
+            boxes = None
+
+        class FakeModel:
+            def __init__(self):
+                self.sources = []
+
+            def track(self, source, **kwargs):
+                assert kwargs["persist"] is True
+                self.sources.append(list(source))
+                return [FakeResult() for _ in source]
+
+        tracker = UltralyticsTracker()
+        tracker._model = model = FakeModel()
+
+        results = list(tracker.track_stream(iter(range(5)), batch=2))
+
+        assert results == [[]] * 5
+        assert model.sources == [[0, 1], [2, 3], [4]]
+
+
+class TestResultArrays:
+    """UltralyticsTracker._result_arraysのテスト"""
+
+    def test_single_transfer(self):
+        """(N, 7) のdataテンソルを1回だけCPUへ転送し、列ごとの配列に分解すること"""
+
+        class FakeTensor:
+            def __init__(self, array):
+                self.array = array
+                self.transfers = 0
+
+            def cpu(self):
+                self.transfers += 1
+                return self
+
+            def numpy(self):
+                return self.array
+
+        data = FakeTensor(np.array([
+            [10.7, 20.2, 30.9, 40.5, 3.0, 0.75, 0.0],
+            [1.0, 2.0, 3.0, 4.0, 8.0, 0.5, 0.0],
+        ], dtype=np.float32))
+
+        class FakeBoxes:
+            pass
+
+        class FakeResult:
+            boxes = FakeBoxes()
+
+        result = FakeResult()
+        result.boxes.data = data
+        result.boxes.id = data.array[:, 4]
+
+        bboxes, confidences, track_ids = UltralyticsTracker._result_arrays(result)
+
+        assert data.transfers == 1
+        assert bboxes.tolist() == [[10, 20, 30, 40], [1, 2, 3, 4]]
+        assert track_ids.tolist() == [3, 8]
+        assert confidences.tolist() == pytest.approx([0.75, 0.5])
+
+    def test_no_tracks(self):
+        bboxes, confidences, track_ids = UltralyticsTracker._result_arrays(None)
+        assert bboxes.shape == (0, 4)
+        assert len(confidences) == len(track_ids) == 0
+
+
+class TestUpdateArrays:
+    """UltralyticsTracker.update_arraysのテスト"""
+
+    def test_without_frame(self):
+        """フレームなしの場合は検出結果に連番のIDを割り当てること"""
+        detections = [
+            Detection(bbox=BoundingBox(0, 0, 10, 10), confidence=0.9),
+            Detection(bbox=BoundingBox(20, 20, 40, 40), confidence=0.6),
+        ]
+        tracker = UltralyticsTracker()
+
+        bboxes, confidences, track_ids = tracker.update_arrays(detections)
+
+        assert bboxes.tolist() == [[0, 0, 10, 10], [20, 20, 40, 40]]
+        assert confidences.tolist() == [0.9, 0.6]
+        assert track_ids.tolist() == [0, 1]
+        assert tracker.update(detections) == [
+            TrackedFace(track_id=0, bbox=BoundingBox(0, 0, 10, 10), confidence=0.9),
+            TrackedFace(track_id=1, bbox=BoundingBox(20, 20, 40, 40), confidence=0.6),
+        ]
+
+
+class TestInterpolateTrack:
+    """interpolate_trackのテスト"""
+
+    def test_matches_pairwise_interpolation(self):
+        """複数区間の一括補間が区間ごとのBoundingBox.interpolateと一致すること"""
+        keyframes = {
+            0: BoundingBox(0, 0, 10, 10),
+            1: BoundingBox(3, 1, 13, 11),
+            5: BoundingBox(-7, 20, 31, 47),
+            12: BoundingBox(100, 90, 140, 130),
+        }
+        store = AnnotationStore()
+        for frame, bbox in keyframes.items():
+            store.add(Annotation(frame=frame, bbox=bbox, track_id=1), save_undo=False)
+
+        assert interpolate_track(store, track_id=1) == 3 + 6
+
+        keys = sorted(keyframes)
+        for f1, f2 in zip(keys, keys[1:]):
+            for frame in range(f1 + 1, f2):
+                t = (frame - f1) / (f2 - f1)
+                expected = BoundingBox.interpolate(keyframes[f1], keyframes[f2], t)
+                assert store.get_annotation_by_frame_track(frame, 1).bbox == expected
+
+    def test_single_undo(self):
+        """補間結果はUndo1回で元に戻ること"""
+        store = AnnotationStore()
+        for frame in (0, 10, 20):
+            store.add(
+                Annotation(frame=frame, bbox=BoundingBox(0, 0, 10, 10), track_id=1),
+                save_undo=False,
+            )
+
+        assert interpolate_track(store, track_id=1) == 18
+        assert store.undo()
+        assert store.get_track_frames(1) == [0, 10, 20]
+        assert not store.undo()
@@ -0,0 +1,212 @@
+"""動画読み書きのテスト"""
+
+import queue
+import shutil
+import subprocess
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from defacer.video import writer
+from defacer.video._frame_queue import put_until_stopped
+from defacer.video.reader import VideoReader
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpegが未インストール")
+
+
+@pytest.fixture
+def sample_video(tmp_path):
+    """フレームごとに異なる模様を持つ短い動画を作成"""
+    path = tmp_path / "sample.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 25.0, (64, 48))
+    for i in range(20):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        cv2.rectangle(frame, (i * 2, 10), (i * 2 + 10, 30), (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+class TestVideoReader:
+    """VideoReaderのテスト"""
+
+    def test_prefetch_iteration(self, sample_video):
+        """先読みありのイテレートが先読みなしと同じフレームを返し、途中終了できること"""
+        with VideoReader(sample_video, prefetch=0) as reader:
+            expected = list(reader)
+
+        with VideoReader(sample_video, prefetch=2) as reader:
+            frames = list(reader)
+            assert [i for i, _ in frames] == [i for i, _ in expected]
+            assert all((f == e).all() for (_, f), (_, e) in zip(frames, expected))
+
+            for i, _ in reader:
+                if i == 3:
+                    break
+            assert [i for i, _ in reader][:2] == [0, 1]
+
+    def test_invalid_backend(self, sample_video):
+        with pytest.raises(ValueError):
+            VideoReader(sample_video, backend="unknown")
+
+    @requires_ffmpeg
+    def test_ffmpeg_backend_matches_opencv(self, sample_video):
+        """FFmpegバックエンドの連続読み取り・シークがOpenCVと同じフレームを返すこと"""
+        with VideoReader(sample_video) as reader:
+            expected = [frame for _, frame in reader]
+
+        with VideoReader(sample_video, backend="ffmpeg") as reader:
+            frames = [frame for _, frame in reader]
+            assert len(frames) == len(expected)
+            for frame, exp in zip(frames, expected):
+                assert np.abs(frame.astype(int) - exp.astype(int)).mean() < 2.0
+
+            for frame_number in (7, 3, 19):
+                frame = reader.read_frame(frame_number)
+                exp = expected[frame_number]
+                assert np.abs(frame.astype(int) - exp.astype(int)).mean() < 2.0
+                assert reader.current_frame == frame_number + 1
+
+    @requires_ffmpeg
+    def test_ffmpeg_backend_variable_frame_rate(self, tmp_path):
+        """可変フレームレートの動画でも、FFmpegバックエンドのフレーム数がOpenCVと一致すること"""
+        path = tmp_path / "vfr.mp4"
+        # 10フレーム目以降のタイムスタンプを1秒ずらし、フレーム間隔が不均一な動画を作成
+        subprocess.run(
+            [
+                "ffmpeg", "-y", "-v", "error",
+                "-f", "lavfi", "-i", "testsrc=size=64x48:rate=25:duration=0.8",
+                "-vf", "setpts='PTS+if(gte(N,10),1/TB,0)'",
+                "-fps_mode", "vfr",
+                "-c:v", "mpeg4",
+                str(path),
+            ],
+            check=True,
+        )
+
+        with VideoReader(path) as reader:
+            expected = [frame for _, frame in reader]
+        with VideoReader(path, backend="ffmpeg") as reader:
+            frames = [frame for _, frame in reader]
+
+        assert len(frames) == len(expected)
+        for frame, exp in zip(frames, expected):
+            assert np.abs(frame.astype(int) - exp.astype(int)).mean() < 2.0
+
+    def test_sequential_read_frame_skips_seek(self, sample_video):
+        """連続したread_frameではOpenCVのシークを行わず、同じフレームを返すこと"""
+        with VideoReader(sample_video, prefetch=0) as reader:
+            expected = [frame for _, frame in reader]
+
+        class CountingCapture:
+            def __init__(self, cap):
+                self._cap = cap
+                self.seeks = 0
+
+            def set(self, prop, value):
+                self.seeks += 1
+                return self._cap.set(prop, value)
+
+            def __getattr__(self, name):
+                return getattr(self._cap, name)
+
+        with VideoReader(sample_video) as reader:
+            reader._cap = cap = CountingCapture(reader._cap)
+            for frame_number in range(4, 10):
+                assert (reader.read_frame(frame_number) == expected[frame_number]).all()
+            assert cap.seeks == 1
+
+            assert (reader.read_frame(2) == expected[2]).all()
+            assert cap.seeks == 2
+
+
+class TestAudioCodecArgs:
+    """音声エンコード引数の選択のテスト"""
+
+    @pytest.mark.parametrize(
+        ("audio_codec", "output", "expected"),
+        [
+            ("aac", "out.mp4", "copy"),
+            ("opus", "out.mp4", "aac"),
+            ("opus", "out.mkv", "copy"),
+            ("aac", "out.avi", "aac"),
+            (None, "out.mp4", "aac"),
+        ],
+    )
+    def test_copy_when_compatible(self, monkeypatch, tmp_path, audio_codec, output, expected):
+        monkeypatch.setattr(writer, "_probe_audio_codec", lambda path: audio_codec)
+        args = writer._audio_codec_args(tmp_path / "in.mp4", tmp_path / output)
+        assert args == ["-c:a", expected]
+
+
+class TestExportVideoWithAudio:
+    """export_video_with_audioのテスト"""
+
+    @requires_ffmpeg
+    def test_rotating_buffers(self, sample_video, tmp_path):
+        """エンコードスレッドが使い回しバッファのフレームを順番通りに書き込むこと"""
+        buffers = [
+            np.empty((48, 64, 3), dtype=np.uint8)
+            for _ in range(writer.ENCODE_QUEUE_SIZE + 2)
+        ]
+
+        def frames():
+            for i in range(30):
+                buffer = buffers[i % len(buffers)]
+                buffer[:] = i * 8
+                yield buffer
+
+        output = tmp_path / "out.mp4"
+        assert writer.export_video_with_audio(
+            sample_video, output, frames(), 30, 25.0, 64, 48, crf=0
+        )
+
+        with VideoReader(output) as reader:
+            means = [frame.mean() for _, frame in reader]
+        assert len(means) == 30
+        assert all(abs(mean - i * 8) < 6 for i, mean in enumerate(means))
+
+    @requires_ffmpeg
+    def test_encoder_error_is_raised(self, sample_video, tmp_path, monkeypatch):
+        """エンコードスレッドの例外で停止せず、呼び出し側に例外が伝わること"""
+        def failing_buffer(frame):
+            raise RuntimeError("encode failed")
+
+        monkeypatch.setattr(writer, "_frame_buffer", failing_buffer)
+        frames = (np.zeros((48, 64, 3), dtype=np.uint8) for _ in range(100))
+
+        with pytest.raises(RuntimeError, match="encode failed"):
+            writer.export_video_with_audio(
+                sample_video, tmp_path / "out.mp4", frames, 100, 25.0, 64, 48
+            )
+
+    @requires_ffmpeg
+    def test_frame_size_mismatch(self, sample_video, tmp_path):
+        """出力サイズと異なるフレームはリサイズせずエラーにすること"""
+        frames = iter([np.zeros((48, 64, 3), dtype=np.uint8), np.zeros((24, 32, 3), dtype=np.uint8)])
+        with pytest.raises(ValueError):
+            writer.export_video_with_audio(
+                sample_video, tmp_path / "out.mp4", frames, 2, 25.0, 64, 48
+            )
+
+        with pytest.raises(ValueError):
+            with writer.VideoWriter(tmp_path / "out.mp4", 64, 48, 25.0) as video_writer:
+                video_writer.write(np.zeros((24, 32, 3), dtype=np.uint8))
+
+
+class TestPutUntilStopped:
+    """put_until_stoppedのテスト"""
+
+    def test_put_and_stop(self):
+        """空きがあれば投入し、満杯のまま停止要求が出たら中断すること"""
+        frames = queue.Queue(maxsize=1)
+        stop = threading.Event()
+        assert put_until_stopped(frames, 1, stop)
+
+        timer = threading.Timer(0.2, stop.set)
+        timer.start()
+        assert not put_until_stopped(frames, 2, stop)
+        timer.join()
+        assert frames.get_nowait() == 1